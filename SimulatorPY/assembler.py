@@ -0,0 +1,239 @@
+import hashlib
+import json
+import os
+import struct
+import sys
+
+from engine import IMEM_SIZE, Instr, Op, compute_masks, parse_program
+
+# CorgVerilog/Verilog.txt ile aynı 16-bit komut alanları:
+#   [15:12] opcode  [11:9] rs  [8:6] rt  [5:3] rd  [5:0] imm (6-bit)
+#   j: [11:0] mutlak hedef adres
+# Verilog modeli şimdilik sadece ADD (0000), ADDI (0001), JUMP (1100) ve
+# NOP (F000) çalıştırır; diğer opcode'lar bu modelin uzantısıdır.
+# Fark: burada addi/lw/sw/beq/bne imm'i işaretli 6-bit (-32..31) olarak
+# kodlanır ve çözülür (simülatörün anlamı budur), Verilog ise imm'i sıfırla
+# genişletir (ID_EX_imm <= {10'b0, IF_ID_instr[5:0]}). Negatif immediate'li
+# bir addi (ör. addi R1, R1, -1 -> imm 0x3F) Verilog'da +63 olarak çalışır;
+# Verilog'la birebir eşleşmesi gereken image'larda addi imm'i 0..31 olmalıdır.
+OPCODES = {
+    Op.ADD: 0x0, Op.SUB: 0x0, Op.AND: 0x0, Op.OR: 0x0, Op.SLT: 0x0,
+    Op.ADDI: 0x1, Op.LW: 0x2, Op.SW: 0x3, Op.BEQ: 0x4, Op.BNE: 0x5,
+    Op.SLL: 0x6, Op.SRL: 0x7, Op.J: 0xC, Op.JAL: 0xD, Op.JR: 0xE,
+    Op.NOP: 0xF, Op.HALT: 0xF,
+}
+FUNCT = {Op.ADD: 0, Op.SUB: 1, Op.AND: 2, Op.OR: 3, Op.SLT: 4}
+FUNCT_OPS = {funct: op for op, funct in FUNCT.items()}
+NOP_WORD = 0xF000
+HALT_WORD = 0xF001
+
+# Önbellekteki image dosyası: başlık + big-endian word'ler + label'lar (JSON)
+IMAGE_MAGIC = b"R16I"
+IMAGE_VERSION = 1
+IMAGE_HEADER = struct.Struct(">4sHHI")
+
+
+def _imm6(val, signed=True):
+    lo, hi = (-32, 31) if signed else (0, 63)
+    if not lo <= val <= hi:
+        raise ValueError(f"immediate {val} does not fit in 6 bits")
+    return val & 0x3F
+
+
+def encode(instr):
+    """Çözülmüş bir komutu 16-bit makine koduna çevirir."""
+    op = instr.op
+    if op == Op.NOP:
+        return NOP_WORD
+    if op == Op.HALT:
+        return HALT_WORD
+    if op in (Op.J, Op.JAL, Op.BEQ, Op.BNE) and instr.target is None:
+        raise ValueError(f"undefined label in {instr.text!r}")
+
+    word = OPCODES[op] << 12
+    if op in FUNCT:
+        word |= instr.rs << 9 | instr.rt << 6 | instr.rd << 3 | FUNCT[op]
+    elif op in (Op.ADDI, Op.LW):
+        word |= instr.rs << 9 | instr.rd << 6 | _imm6(instr.imm)
+    elif op == Op.SW:
+        word |= instr.rs << 9 | instr.rt << 6 | _imm6(instr.imm)
+    elif op in (Op.SLL, Op.SRL):
+        word |= instr.rs << 9 | instr.rd << 6 | _imm6(instr.imm, signed=False)
+    elif op in (Op.BEQ, Op.BNE):
+        # Dallanma hedefi PC'ye göreli: target - (addr + 1)
+        word |= instr.rs << 9 | instr.rt << 6 | _imm6(instr.target - (instr.addr + 1))
+    elif op == Op.J:
+        word |= instr.target & 0xFFF
+    elif op == Op.JAL:
+        word |= instr.rd << 9 | (instr.target & 0x1FF)
+    elif op == Op.JR:
+        word |= instr.rs << 9
+    return word
+
+
+def decode_word(word, addr):
+    """16-bit kodu metin ayrıştırmadan doğrudan Instr kaydına çevirir.
+
+    text disassembly metnidir (hedefler "L<adres>" label'ı olur); alanlar
+    aynı komutun engine.decode ile çözülmüş hâliyle aynıdır.
+    """
+    opcode = word >> 12
+    rs, rt, rd = (word >> 9) & 7, (word >> 6) & 7, (word >> 3) & 7
+    imm = word & 0x3F
+    simm = imm - 64 if imm & 0x20 else imm
+    if opcode == 0x0:
+        op = FUNCT_OPS.get(word & 7)
+        if op is None:
+            raise ValueError(f"invalid R-type function {word & 7} in 0x{word:04X}")
+        ins = Instr(op, rd, rs, rt, srcs=(rs, rt), addr=addr,
+                    text=f"{op.name.lower()} R{rd}, R{rs}, R{rt}")
+    elif opcode == 0x1:
+        ins = Instr(Op.ADDI, rt, rs, imm=simm, srcs=(rs,), addr=addr, text=f"addi R{rt}, R{rs}, {simm}")
+    elif opcode == 0x2:
+        ins = Instr(Op.LW, rt, rs, imm=simm, srcs=(rs,), addr=addr, text=f"lw R{rt}, {simm}(R{rs})")
+    elif opcode == 0x3:
+        ins = Instr(Op.SW, rs=rs, rt=rt, imm=simm, srcs=(rs, rt), addr=addr, text=f"sw R{rt}, {simm}(R{rs})")
+    elif opcode in (0x4, 0x5):
+        op = Op.BEQ if opcode == 0x4 else Op.BNE
+        target = addr + 1 + simm
+        ins = Instr(op, rs=rs, rt=rt, target=target, srcs=(rs, rt), addr=addr,
+                    text=f"{op.name.lower()} R{rs}, R{rt}, L{target}")
+    elif opcode in (0x6, 0x7):
+        op = Op.SLL if opcode == 0x6 else Op.SRL
+        ins = Instr(op, rt, rs, imm=imm, srcs=(rs,), addr=addr, text=f"{op.name.lower()} R{rt}, R{rs}, {imm}")
+    elif opcode == 0xC:
+        ins = Instr(Op.J, target=word & 0xFFF, addr=addr, text=f"j L{word & 0xFFF}")
+    elif opcode == 0xD:
+        ins = Instr(Op.JAL, rs, target=word & 0x1FF, addr=addr, text=f"jal R{rs}, L{word & 0x1FF}")
+    elif opcode == 0xE:
+        ins = Instr(Op.JR, rs=rs, srcs=(rs,), addr=addr, text=f"jr R{rs}")
+    elif word == NOP_WORD:
+        ins = Instr(Op.NOP, addr=addr, text="nop")
+    elif word == HALT_WORD:
+        ins = Instr(Op.HALT, addr=addr, text="halt")
+    else:
+        raise ValueError(f"invalid instruction word 0x{word:04X}")
+    return compute_masks(ins)
+
+
+def disassemble(word, addr):
+    """16-bit kodu assembly metnine çevirir (hedefler "L<adres>" label'ı olur)."""
+    return decode_word(word, addr).text
+
+
+def assemble(source):
+    """İki geçişli assembler: (word listesi, label'lar) döndürür."""
+    instruction_memory, labels = parse_program(source)
+    words = []
+    for instr in instruction_memory:
+        if instr is None:
+            break
+        try:
+            words.append(encode(instr))
+        except ValueError as e:
+            raise ValueError(f"Address {instr.addr}: {instr.text!r}: {e}") from None
+    return words, labels
+
+
+def decode_image(words, labels=None):
+    """Makine kodunu CPU.load_decoded için (instruction_memory, labels) ikilisine çevirir."""
+    words = list(words)
+    while words and words[-1] == NOP_WORD:
+        words.pop()  # Verilog'daki gibi F000 ile doldurulmuş boş bellek
+    if len(words) > IMEM_SIZE:
+        raise ValueError(f"image has {len(words)} words, instruction memory holds {IMEM_SIZE}")
+    instruction_memory = [None] * IMEM_SIZE
+    # Dallanma hedefleri için "L<adres>" label'ları; kaynak label'lar varsa onlar da eklenir
+    all_labels = {}
+    for addr, word in enumerate(words):
+        instr = instruction_memory[addr] = decode_word(word, addr)
+        if instr.target is not None:
+            all_labels[f"L{instr.target}"] = instr.target
+    if labels:
+        all_labels.update(labels)
+    return instruction_memory, all_labels
+
+
+# --- Image dosyaları ---
+def read_image(path):
+    """.bin (ham big-endian word'ler) ya da hex/$readmemh metin dosyasını okur."""
+    if str(path).endswith(".bin"):
+        with open(path, "rb") as f:
+            data = f.read()
+        if len(data) % 2:
+            raise ValueError(f"{path}: odd number of bytes")
+        return list(struct.unpack(f">{len(data) // 2}H", data))
+
+    # $readmemh: boşlukla ayrılmış hex word'ler, @adres direktifleri, // yorumlar
+    words = []
+    addr = 0
+    with open(path) as f:
+        for line in f:
+            for token in line.split("//")[0].split():
+                if token.startswith("@"):
+                    addr = int(token[1:], 16)
+                    continue
+                token = token.replace("_", "")
+                if token.lower().startswith("0x"):
+                    token = token[2:]
+                if addr >= len(words):
+                    words.extend([NOP_WORD] * (addr + 1 - len(words)))
+                words[addr] = int(token, 16) & 0xFFFF
+                addr += 1
+    return words
+
+
+def write_hex(words, path):
+    """$readmemh ile okunabilen hex dosyası yazar."""
+    with open(path, "w") as f:
+        for addr, word in enumerate(words):
+            f.write(f"{word:04X}  // {addr}: {disassemble(word, addr)}\n")
+
+
+def _pack_image(words, labels):
+    label_blob = json.dumps(labels).encode()
+    return IMAGE_HEADER.pack(IMAGE_MAGIC, IMAGE_VERSION, len(words), len(label_blob)) \
+        + struct.pack(f">{len(words)}H", *words) + label_blob
+
+
+def _unpack_image(data):
+    magic, version, count, label_len = IMAGE_HEADER.unpack_from(data)
+    if magic != IMAGE_MAGIC or version != IMAGE_VERSION:
+        raise ValueError("not a RISC-16 image")
+    offset = IMAGE_HEADER.size
+    words = list(struct.unpack_from(f">{count}H", data, offset))
+    offset += 2 * count
+    labels = json.loads(data[offset:offset + label_len].decode())
+    return words, labels
+
+
+def assemble_cached(source, cache_dir):
+    """assemble() sonucunu kaynak hash'iyle cache_dir'de saklar ve tekrar kullanır."""
+    key = hashlib.sha256(f"{IMAGE_VERSION}:{source}".encode()).hexdigest()
+    path = os.path.join(cache_dir, f"{key}.r16")
+    try:
+        with open(path, "rb") as f:
+            return _unpack_image(f.read())
+    except (OSError, ValueError, struct.error):
+        pass
+    words, labels = assemble(source)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(_pack_image(words, labels))
+    os.replace(tmp, path)
+    return words, labels
+
+
+def load_image(cpu, words, labels=None):
+    """Makine kodunu doğrudan CPU'nun instruction memory'sine yükler."""
+    cpu.load_decoded(*decode_image(words, labels))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("usage: python assembler.py program.asm output.hex")
+        sys.exit(2)
+    with open(sys.argv[1]) as f:
+        words, _ = assemble(f.read())
+    write_hex(words, sys.argv[2])
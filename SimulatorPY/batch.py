@@ -0,0 +1,220 @@
+import numpy as np
+
+from engine import (DEFAULT_MEMORY_SIZE, IMEM_SIZE, REG_NAMES, Op, R_TYPE,
+                    address_mask, parse_program)
+
+# Pipeline aşamalarındaki baloncukların kodları (gerçek komutlar adresleriyle tutulur)
+STALL_CODE, FLUSH_CODE, EMPTY_CODE = -3, -2, -1
+IF, ID, EX, MEM, WB = range(5)
+
+
+def _wrap(x):
+    # to_signed_16'nın vektörel hali
+    return (((x + 0x8000) & 0xFFFF) - 0x8000).astype(np.int16)
+
+
+class BatchCPU:
+    """Aynı programı N bağımsız CPU bağlamında adım adım (lockstep) çalıştırır.
+
+    Register'lar N×8 int16, bellek N×memory_size uint8 NumPy dizileridir.
+    Her cycle'da tüm örnekler birlikte ilerler; beq/bne'de ayrışan örnekler
+    maskelerle ayrı yollardan devam eder. Pipeline zamanlaması CPU.step ile
+    birebir aynıdır, bu yüzden cycle/stall sayıları da CPU ile eşleşir.
+
+    Girdiler load_program'dan sonra regs / memory dizilerine yazılabilir.
+    """
+
+    def __init__(self, n, memory_size=DEFAULT_MEMORY_SIZE):
+        self.n = n
+        self.addr_mask = address_mask(memory_size)
+        self.regs = np.zeros((n, 8), dtype=np.int16)
+        self.memory = np.zeros((n, memory_size), dtype=np.uint8)
+        self.instruction_memory = [None] * IMEM_SIZE
+        self.labels = {}
+        self._build_tables()
+        self.reset()
+
+    def reset(self):
+        n = self.n
+        self.regs[:] = 0
+        self.pc = np.zeros(n, dtype=np.int32)
+        self.stages = np.full((5, n), EMPTY_CODE, dtype=np.int32)
+        self.retired = np.zeros(n, dtype=bool)
+        self.done = np.zeros(n, dtype=bool)
+        self.total_cycles = np.zeros(n, dtype=np.int64)
+        self.stall_count = np.zeros(n, dtype=np.int64)
+        self.executed_instr_count = np.zeros(n, dtype=np.int64)
+
+    def load_program(self, raw_code):
+        self.reset()
+        self.instruction_memory, self.labels = parse_program(raw_code)
+        self._build_tables()
+
+    def _build_tables(self):
+        # Aşama kodu + 3 ile indekslenen tablolar: önce baloncuklar, sonra adresler
+        ops = [Op.STALL, Op.NOP, Op.EMPTY]
+        rds = [-1, -1, -1]
+        srcs = [0, 0, 0]
+        for ins in self.instruction_memory:
+            if ins is None:
+                ops.append(Op.EMPTY)
+                rds.append(-1)
+                srcs.append(0)
+            else:
+                ops.append(ins.op)
+                rds.append(ins.rd)
+                srcs.append(sum(1 << r for r in set(ins.srcs)))
+        self.op_table = np.array(ops, dtype=np.int16)
+        self.rd_table = np.array(rds, dtype=np.int16)
+        self.src_table = np.array(srcs, dtype=np.int16)
+        self.present = np.array([ins is not None for ins in self.instruction_memory], dtype=bool)
+
+    def is_finished(self):
+        busy = (self.op_table[self.stages + 3] > Op.NOP).any(axis=0)
+        pc = self.pc
+        in_range = (pc >= 0) & (pc < IMEM_SIZE)
+        fetchable = in_range & self.present[np.clip(pc, 0, IMEM_SIZE - 1)]
+        return ~busy & ~fetchable
+
+    def step(self):
+        """Tüm örnekleri bir cycle ilerletir; çalışan örnek kalmadıysa False döner."""
+        self.done |= self.is_finished()
+        active = ~self.done
+        if not active.any():
+            return False
+
+        S = self.stages
+        pc = self.pc
+        op_table = self.op_table
+
+        # 1. WB aşamasındaki komutları yürüt (aynı adresteki örnekler birlikte)
+        wb = S[WB]
+        exe = active & (op_table[wb + 3] > Op.STALL) & ~self.retired
+        jumped = np.zeros(self.n, dtype=bool)
+        if exe.any():
+            old_pc = pc.copy()
+            for addr in np.unique(wb[exe]):
+                self._execute(self.instruction_memory[addr], np.flatnonzero(exe & (wb == addr)))
+            jumped = exe & (pc != old_pc)
+            self.retired[jumped] = True
+
+        self.total_cycles[active] += 1
+        rest = active & ~jumped
+        self.retired[rest] = False
+
+        # 2. Load-use hazard: EX'teki lw'nin hedefi ID'de okunuyorsa bekle
+        id_code, ex_code = S[ID] + 3, S[EX] + 3
+        ex_rd = self.rd_table[ex_code]
+        uses = (self.src_table[id_code] >> np.maximum(ex_rd, 0)) & 1
+        stall = rest & (op_table[ex_code] == Op.LW) & (ex_rd > 0) & (uses != 0)
+        normal = rest & ~stall
+        self.stall_count[stall] += 1
+
+        # 3. Kaydırma ve fetch
+        in_range = (pc >= 0) & (pc < IMEM_SIZE)
+        fetch = normal & in_range & self.present[np.clip(pc, 0, IMEM_SIZE - 1)]
+        S[WB] = np.where(rest, S[MEM], S[WB])
+        S[MEM] = np.where(rest, S[EX], S[MEM])
+        S[EX] = np.where(stall, STALL_CODE, np.where(normal, S[ID], S[EX]))
+        S[ID] = np.where(normal, S[IF], S[ID])
+        S[IF] = np.where(fetch, pc, np.where(normal, EMPTY_CODE, S[IF]))
+        pc[fetch] += 1
+        return True
+
+    def run(self, max_cycles=None):
+        """Tüm örnekler bitene ya da max_cycles dolana kadar çalıştırır."""
+        cycles = 0
+        while cycles != max_cycles and self.step():
+            cycles += 1
+        return cycles
+
+    def _flush(self, lanes):
+        self.stages[:MEM + 1, lanes] = FLUSH_CODE
+
+    def _execute(self, ins, lanes):
+        R = self.regs
+        op = ins.op
+        self.executed_instr_count[lanes] += 1
+
+        if op in R_TYPE:
+            a = R[lanes, ins.rs].astype(np.int32)
+            b = R[lanes, ins.rt].astype(np.int32)
+            if op == Op.ADD: res = a + b
+            elif op == Op.SUB: res = a - b
+            elif op == Op.AND: res = a & b
+            elif op == Op.OR: res = a | b
+            else: res = (a < b).astype(np.int32)
+            R[lanes, ins.rd] = _wrap(res)
+
+        elif op == Op.ADDI:
+            R[lanes, ins.rd] = _wrap(R[lanes, ins.rs].astype(np.int32) + ins.imm)
+
+        elif op == Op.LW or op == Op.SW:
+            addr = (R[lanes, ins.rs].astype(np.int32) + ins.imm) & self.addr_mask
+            if op == Op.SW:
+                val = R[lanes, ins.rt].astype(np.int32) & 0xFFFF
+                self.memory[lanes, addr] = val >> 8
+                self.memory[lanes, addr + 1] = val & 0xFF
+            else:
+                hi = self.memory[lanes, addr].astype(np.int32)
+                lo = self.memory[lanes, addr + 1].astype(np.int32)
+                R[lanes, ins.rd] = _wrap((hi << 8) | lo)
+
+        elif op == Op.J:
+            if ins.target is not None:
+                self.pc[lanes] = ins.target
+                self._flush(lanes)
+
+        elif op == Op.JAL:
+            if ins.target is not None:
+                R[lanes, ins.rd] = ins.addr + 1
+                self.pc[lanes] = ins.target
+                self._flush(lanes)
+
+        elif op == Op.JR:
+            self.pc[lanes] = R[lanes, ins.rs]
+            self._flush(lanes)
+
+        elif op == Op.BEQ or op == Op.BNE:
+            equal = R[lanes, ins.rs] == R[lanes, ins.rt]
+            taken = lanes[equal if op == Op.BEQ else ~equal]
+            if ins.target is not None and taken.size:
+                self.pc[taken] = ins.target
+                self._flush(taken)
+
+        # 16 ve üstü kaydırma skaler motorlarda 0 verir; int32'de >= 32 tanımsızdır
+        elif op == Op.SLL:
+            R[lanes, ins.rd] = _wrap(R[lanes, ins.rs].astype(np.int32) << min(ins.imm, 16))
+
+        elif op == Op.SRL:
+            R[lanes, ins.rd] = _wrap((R[lanes, ins.rs].astype(np.int32) & 0xFFFF) >> min(ins.imm, 16))
+
+        elif op == Op.HALT:
+            self.pc[lanes] = IMEM_SIZE
+            self._flush(lanes)
+
+        R[lanes, 0] = 0  # R0 her zaman 0 kalmalı
+
+    def get_performance_metrics(self, i):
+        cycles = int(self.total_cycles[i])
+        executed = int(self.executed_instr_count[i])
+        cpi = cycles / executed if executed > 0 else 0
+        return {
+            "Total Cycles": cycles,
+            "Executed Instructions": executed,
+            "Stall Count": int(self.stall_count[i]),
+            "CPI": round(cpi, 2),
+            "IPC": round(1/cpi, 2) if cpi > 0 else 0,
+            "Fast-Forwarded Instructions": 0
+        }
+
+    def results(self):
+        """Her örnek için son register'lar, bellek ve performans metrikleri."""
+        out = []
+        for i in range(self.n):
+            out.append({
+                "registers": {name: int(v) for name, v in zip(REG_NAMES, self.regs[i])},
+                "memory": self.memory[i].tobytes(),
+                "metrics": self.get_performance_metrics(i),
+            })
+        return out
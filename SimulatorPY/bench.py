@@ -0,0 +1,228 @@
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from cache import Cache
+from engine import CPU
+from predictor import BranchPredictor
+from translator import BlockTranslator
+
+try:
+    from batch import BatchCPU
+except ImportError:  # numpy yoksa batch modu atlanır
+    BatchCPU = None
+
+KERNEL_DIR = Path(__file__).with_name("benchmarks")
+MODES = ("pipeline", "detailed", "functional", "translated", "batch")
+BATCH_LANES = 16
+RESULTS_VERSION = 1
+DEFAULT_THRESHOLD = 10.0  # yüzde
+
+# compare: (metrik, daha büyük daha iyi mi, gürültü sayılan mutlak fark)
+COMPARED = (
+    ("instr_per_sec", True, 0),
+    ("cycles_per_sec", True, 0),
+    ("startup_ms", False, 0.5),
+    ("peak_kib", False, 16),
+)
+
+
+def find_kernels(directory=KERNEL_DIR):
+    return {path.stem: path.read_text() for path in sorted(Path(directory).glob("*.asm"))}
+
+
+def available_modes():
+    return [mode for mode in MODES if mode != "batch" or BatchCPU is not None]
+
+
+def _build(mode, source):
+    """Verilen modda programı yüklenmiş, çalışmaya hazır bir simülatör kurar."""
+    if mode == "batch":
+        sim = BatchCPU(BATCH_LANES)
+        sim.load_program(source)
+        return sim
+    cpu = CPU()
+    cpu.verbose = False
+    if mode == "detailed":
+        # Tam zamanlama modeli: forwarding, EX'te çözülen tahminci ve cache'ler
+        cpu.set_forwarding("full")
+        cpu.predictor = BranchPredictor("2bit", resolve_in_ex=True)
+        cpu.icache = Cache(size=128, line_size=8)
+        cpu.dcache = Cache(size=256, assoc=2, line_size=8)
+    cpu.load_program(source)
+    if mode in ("functional", "translated"):
+        cpu.set_mode("functional")
+    if mode == "translated":
+        cpu.translator = BlockTranslator()
+    return cpu
+
+
+def _counts(mode, sim):
+    """(simüle edilen cycle, çalışan komut); functional modlarda cycle yoktur.
+
+    batch modunda tüm örneklerin toplamıdır (saniyedeki toplam iş).
+    """
+    if mode == "batch":
+        return int(sim.total_cycles.sum()), int(sim.executed_instr_count.sum())
+    instructions = sim.executed_instr_count + sim.functional_instr_count
+    return sim.total_cycles, instructions
+
+
+def measure(source, mode, repeat=3):
+    """Bir kernel'i bir modda ölçer; en iyi repeat denemesinin sonuçlarını döndürür."""
+    best_run = best_startup = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        sim = _build(mode, source)
+        built = time.perf_counter()
+        sim.run()
+        end = time.perf_counter()
+        best_startup = min(best_startup, built - start)
+        best_run = min(best_run, end - built)
+    cycles, instructions = _counts(mode, sim)
+
+    # Bellek ölçümü ayrı bir koşuda: tracemalloc zamanlamayı bozar
+    gc.collect()
+    tracemalloc.start()
+    try:
+        _build(mode, source).run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "cycles": cycles,
+        "instructions": instructions,
+        "seconds": round(best_run, 6),
+        "cycles_per_sec": round(cycles / best_run) if cycles and best_run else None,
+        "instr_per_sec": round(instructions / best_run) if best_run else None,
+        "startup_ms": round(1000 * best_startup, 3),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def run_suite(kernels, modes, repeat=3, progress=None):
+    results = {}
+    for name, source in kernels.items():
+        results[name] = {}
+        for mode in modes:
+            results[name][mode] = record = measure(source, mode, repeat)
+            if progress:
+                progress(name, mode, record)
+    return {
+        "version": RESULTS_VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def compare(base, new, threshold=DEFAULT_THRESHOLD):
+    """İki sonuç dosyasını karşılaştırır: (gerileme satırları, bilgi satırları).
+
+    Hız metrikleri threshold yüzdesinden fazla düşerse, başlangıç süresi ve
+    bellek tepe değeri threshold'dan fazla artarsa gerileme sayılır. Cycle ya
+    da komut sayısı değişimi zamanlama modelinin değiştiğini gösterir ve
+    sadece bilgi olarak raporlanır.
+    """
+    regressions, notes = [], []
+    limit = threshold / 100
+    base_results, new_results = base["results"], new["results"]
+    for kernel in sorted(base_results.keys() & new_results.keys()):
+        for mode in sorted(base_results[kernel].keys() & new_results[kernel].keys()):
+            old, cur = base_results[kernel][mode], new_results[kernel][mode]
+            where = f"{kernel}/{mode}"
+            for key in ("cycles", "instructions"):
+                if old.get(key) != cur.get(key):
+                    notes.append(f"{where}: simulated {key} changed {old.get(key)} -> {cur.get(key)}")
+            for key, higher_better, noise in COMPARED:
+                a, b = old.get(key), cur.get(key)
+                if not a or b is None or abs(b - a) <= noise:
+                    continue
+                change = (b - a) / a
+                if (-change if higher_better else change) > limit:
+                    regressions.append(f"{where}: {key} {a:,} -> {b:,} ({100 * change:+.1f}%)")
+    for kernel in sorted(base_results.keys() - new_results.keys()):
+        notes.append(f"{kernel}: missing from new results")
+    return regressions, notes
+
+
+def _load(path):
+    with open(path) as f:
+        data = json.load(f)
+    if data.get("version") != RESULTS_VERSION:
+        raise ValueError(f"{path}: unsupported benchmark results version {data.get('version')}")
+    return data
+
+
+def _report(regressions, notes, threshold):
+    for line in notes:
+        print(f"  note: {line}")
+    for line in regressions:
+        print(f"  REGRESSION: {line}")
+    print(f"{len(regressions)} regressions beyond {threshold:g}%")
+    return 1 if regressions else 0
+
+
+def _print_record(kernel, mode, record):
+    cps = f"{record['cycles_per_sec']:>12,}" if record["cycles_per_sec"] else f"{'-':>12}"
+    print(f"{kernel:>10} {mode:>10}: {cps} cycles/s {record['instr_per_sec']:>12,} instr/s "
+          f"{record['startup_ms']:>8.2f} ms startup {record['peak_kib']:>9,.1f} KiB peak")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the simulator engines on RISC-16 kernels")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="measure kernels and optionally write a JSON baseline")
+    run.add_argument("-o", "--output", default=None, help="write JSON results here")
+    run.add_argument("-k", "--kernels", nargs="+", default=None, help="kernel names (default: all)")
+    run.add_argument("-m", "--modes", nargs="+", choices=MODES, default=None,
+                     help="engine modes (default: all available)")
+    run.add_argument("-r", "--repeat", type=int, default=3, help="runs per measurement, best is kept")
+    run.add_argument("--dir", default=KERNEL_DIR, help="kernel directory")
+    run.add_argument("--baseline", default=None, help="compare against this JSON baseline")
+    run.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="regression threshold in percent")
+
+    cmp = sub.add_parser("compare", help="compare two JSON result files")
+    cmp.add_argument("base")
+    cmp.add_argument("new")
+    cmp.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="regression threshold in percent")
+    args = parser.parse_args(argv)
+
+    if args.command == "compare":
+        return _report(*compare(_load(args.base), _load(args.new), args.threshold), args.threshold)
+
+    kernels = find_kernels(args.dir)
+    if args.kernels:
+        unknown = set(args.kernels) - kernels.keys()
+        if unknown:
+            print(f"Unknown kernels: {', '.join(sorted(unknown))} (have {', '.join(kernels)})", file=sys.stderr)
+            return 2
+        kernels = {name: kernels[name] for name in args.kernels}
+    if not kernels:
+        print(f"No .asm kernels found in {args.dir}", file=sys.stderr)
+        return 1
+    modes = args.modes or available_modes()
+    if "batch" in modes and BatchCPU is None:
+        print("batch mode needs numpy", file=sys.stderr)
+        return 2
+
+    results = run_suite(kernels, modes, args.repeat, progress=_print_record)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        return _report(*compare(_load(args.baseline), results, args.threshold), args.threshold)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,16 @@
+# Sıkı aritmetik döngü: ALU komutları ve tek bir geri dallanma
+        addi R1, R0, 31
+        sll R1, R1, 7          # R1 = 3968 tur
+        addi R2, R0, 1
+        addi R3, R0, 0
+loop:   add R3, R3, R2
+        sub R4, R3, R1
+        and R5, R4, R3
+        or R5, R5, R2
+        slt R6, R5, R3
+        sll R4, R4, 2
+        srl R4, R4, 1
+        add R2, R2, R6
+        addi R1, R1, -1
+        bne R1, R0, loop
+        halt
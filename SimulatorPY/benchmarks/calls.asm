@@ -0,0 +1,24 @@
+# Özyinelemeli çağrılar: sum(n) = n + sum(n - 1), jal/jr ve R6'da bellek yığını
+        addi R5, R0, 31
+        sll R5, R5, 2          # R5 = 124 tekrar
+main:   addi R6, R0, 31
+        sll R6, R6, 5          # yığın tepesi = 992
+        addi R1, R0, 24        # n
+        jal R7, sum
+        addi R5, R5, -1
+        bne R5, R0, main
+        halt
+# sum: girdi R1, sonuç R2, dönüş adresi R7
+sum:    bne R1, R0, rec
+        addi R2, R0, 0
+        jr R7
+rec:    addi R6, R6, -4
+        sw R7, 0(R6)
+        sw R1, 2(R6)
+        addi R1, R1, -1
+        jal R7, sum
+        lw R1, 2(R6)
+        lw R7, 0(R6)
+        addi R6, R6, 4
+        add R2, R2, R1
+        jr R7
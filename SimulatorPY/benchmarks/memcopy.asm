@@ -0,0 +1,22 @@
+# Bellek kopyalama: 0..254'teki 128 word'ü 512..766'ya lw/sw ile 62 kez kopyalar
+        addi R7, R0, 31
+        sll R7, R7, 1          # R7 = 62 tekrar
+        addi R5, R0, 16
+        sll R5, R5, 4          # R5 = 256: kaynağın sonu
+        addi R1, R0, 0
+fill:   sw R1, 0(R1)
+        addi R1, R1, 2
+        bne R1, R5, fill
+again:  addi R1, R0, 0         # kaynak
+        addi R2, R0, 16
+        sll R2, R2, 5          # hedef = 512
+copy:   lw R3, 0(R1)
+        lw R4, 2(R1)
+        sw R3, 0(R2)
+        sw R4, 2(R2)
+        addi R1, R1, 4
+        addi R2, R2, 4
+        bne R1, R5, copy
+        addi R7, R7, -1
+        bne R7, R0, again
+        halt
@@ -0,0 +1,30 @@
+# Dallanma yoğun sıralama: 48 word'lük ters sıralı diziyi kabarcık sıralamasıyla 2 kez sıralar
+        addi R5, R0, 24
+        sll R5, R5, 2          # R5 = 96: dizinin sonu (48 word)
+        addi R7, R0, 2
+        sw R7, 0(R5)           # tekrar sayacı dizinin hemen arkasında
+again:  addi R1, R0, 0
+        addi R3, R0, 24
+        sll R3, R3, 1          # ilk değer 48, azalarak
+init:   sw R3, 0(R1)
+        addi R3, R3, -1
+        addi R1, R1, 2
+        bne R1, R5, init
+        addi R4, R5, -2        # son karşılaştırılan çiftin adresi
+outer:  addi R1, R0, 0
+        addi R6, R0, 0         # bu turda yer değişti mi
+inner:  lw R2, 0(R1)
+        lw R3, 2(R1)
+        slt R7, R3, R2
+        beq R7, R0, noswap
+        sw R3, 0(R1)
+        sw R2, 2(R1)
+        addi R6, R0, 1
+noswap: addi R1, R1, 2
+        bne R1, R4, inner
+        bne R6, R0, outer
+        lw R7, 0(R5)
+        addi R7, R7, -1
+        sw R7, 0(R5)
+        bne R7, R0, again
+        halt
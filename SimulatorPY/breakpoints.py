@@ -0,0 +1,251 @@
+import operator
+import re
+
+from engine import IMEM_SIZE, REG_NAMES, Op
+
+WATCH_MODES = ("write", "change")
+# interest tablosundaki bayraklar: adres breakpoint'i / yazma sonrası kontrol
+BREAK, WATCH = 1, 2
+
+_COMPARE = {"==": operator.eq, "!=": operator.ne, "<=": operator.le,
+            ">=": operator.ge, "<": operator.lt, ">": operator.gt}
+_TERM = re.compile(r"^\s*(\S+?)\s*(==|!=|<=|>=|<|>)\s*(\S+)\s*$")
+
+
+def _register(token):
+    name = token.upper()
+    return REG_NAMES.index(name) if name in REG_NAMES else None
+
+
+def compile_condition(text):
+    """"R3 > 100 and R1 != 0" gibi koşulu (fonksiyon(regs), okunan register maskesi) yapar.
+
+    Terimler register ya da tamsayı olabilir; register'lar işaretli
+    16-bit değerleriyle karşılaştırılır.
+    """
+    terms = []
+    mask = 0
+    for part in re.split(r"\s+and\s+", text.strip()):
+        match = _TERM.match(part)
+        if not match:
+            raise ValueError(f"bad condition {part!r} (expected e.g. R3 > 100)")
+        left, op, right = match.groups()
+        operands = []
+        for token in (left, right):
+            reg = _register(token)
+            if reg is not None:
+                operands.append((True, reg))
+                mask |= 1 << reg
+            else:
+                try:
+                    operands.append((False, int(token, 0)))
+                except ValueError:
+                    raise ValueError(f"bad operand {token!r} in condition {text!r}") from None
+        terms.append((_COMPARE[op], *operands))
+    if not mask:
+        raise ValueError(f"condition {text!r} does not use a register")
+
+    def check(regs):
+        for compare, (l_reg, l), (r_reg, r) in terms:
+            if not compare(regs[l] if l_reg else l, regs[r] if r_reg else r):
+                return False
+        return True
+    return check, mask & ~1  # R0 hiç yazılmaz
+
+
+class BreakpointSet:
+    """Adres breakpoint'leri, register/bellek watchpoint'leri ve koşullar.
+
+    cpu.breakpoints = BreakpointSet() ile açılır, cpu.run_until_break() ile
+    kullanılır (sadece pipeline modu). Tanımlar compile() ile program
+    adreslerine göre bir interest tablosuna çevrilir: her komut için
+    breakpoint var mı, watch edilen bir register'ı ya da (sw ise) belleği
+    yazabilir mi. Koşu döngüsü WB'ye gelen her komut için sadece bu tablo
+    değerine bakar; ayrıntılı kontrol yalnızca işaretli komutlarda yapılır.
+
+    Adres breakpoint'i komut WB'de yürütülmeden önce, watchpoint ve
+    bağımsız koşullar ise yürütüldükten sonra durdurur. Koşul sadece
+    içindeki register'lardan biri yazıldığında değerlendirilir.
+    """
+
+    def __init__(self):
+        self.entries = {}  # id -> (tür, tanım metni, ayrıntılar)
+        self.next_id = 1
+        self.hit = None  # son durmanın açıklaması
+        self.stop_cycle = -1  # son adres breakpoint'inde durulan cycle
+        self.interest = bytearray(IMEM_SIZE + 1)  # son eleman: adresi -1 olan baloncuklar
+        self._imem = None  # interest'in hesaplandığı program (None: yeniden hesapla)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _add(self, kind, text, *details):
+        bp_id = self.next_id
+        self.next_id += 1
+        self.entries[bp_id] = (kind, text, details)
+        self._imem = None
+        return bp_id
+
+    def add_breakpoint(self, where, condition=None):
+        """where: komut adresi ya da label; condition: isteğe bağlı koşul metni."""
+        check = compile_condition(condition)[0] if condition else None
+        text = f"{where} if {condition}" if condition else str(where)
+        return self._add("break", text, where, check)
+
+    def add_watchpoint(self, target, mode="write"):
+        """target: "R3" ya da bellek byte adresi (word'e hizalanır)."""
+        if mode not in WATCH_MODES:
+            raise ValueError(f"mode must be one of {WATCH_MODES}")
+        reg = _register(target) if isinstance(target, str) else None
+        if reg is not None:
+            if reg == 0:
+                raise ValueError("R0 is never written")
+            return self._add("reg", f"watch {REG_NAMES[reg]} {mode}", reg, mode)
+        addr = int(target, 0) if isinstance(target, str) else target
+        if addr < 0:
+            raise ValueError(f"bad watch address {target!r}")
+        return self._add("mem", f"watch {addr & ~1} {mode}", addr & ~1, mode)
+
+    def add_condition(self, condition):
+        check, mask = compile_condition(condition)
+        return self._add("cond", f"if {condition}", check, mask)
+
+    def add(self, spec):
+        """Metin tanımından ekler: "loop", "12 if R3 > 100", "if R1 == 0",
+        "watch R3", "watch 0x20 change". Eklenenin id'sini döndürür."""
+        spec = spec.strip()
+        if spec.startswith("watch "):
+            target, _, mode = spec[6:].strip().partition(" ")
+            return self.add_watchpoint(target, mode.strip() or "write")
+        if spec.startswith("if "):
+            return self.add_condition(spec[3:])
+        where, _, condition = spec.partition(" if ")
+        where = where.strip()
+        if not where or len(where.split()) != 1:
+            raise ValueError(f"bad breakpoint {spec!r} (expected an address or label, optionally with 'if')")
+        if where.isdigit() or where.lower().startswith("0x"):
+            where = int(where, 0)
+        return self.add_breakpoint(where, condition.strip() or None)
+
+    def remove(self, bp_id):
+        del self.entries[bp_id]
+        self._imem = None
+
+    def clear(self):
+        self.entries.clear()
+        self.stop_cycle = -1
+        self._imem = None
+
+    def describe(self):
+        return [(bp_id, text) for bp_id, (_, text, _) in self.entries.items()]
+
+    def compile(self, cpu):
+        """Tanımları cpu'nun yüklü programına göre interest tablosuna çevirir."""
+        imem = cpu.instruction_memory
+        if imem is self._imem:
+            return
+        breaks, reg_watches, mem_watches, conditions = {}, {}, {}, []
+        watch_mask = 0
+        for bp_id, (kind, text, details) in self.entries.items():
+            if kind == "break":
+                where, check = details
+                addr = cpu.labels.get(where) if isinstance(where, str) else where
+                if addr is None:
+                    raise ValueError(f"unknown label {where!r}")
+                if not 0 <= addr < IMEM_SIZE:
+                    raise ValueError(f"breakpoint address {addr} is outside instruction memory")
+                breaks.setdefault(addr, []).append((bp_id, text, check))
+            elif kind == "reg":
+                reg, mode = details
+                reg_watches.setdefault(reg, []).append((bp_id, mode))
+                watch_mask |= 1 << reg
+            elif kind == "mem":
+                addr, mode = details
+                mem_watches.setdefault(addr, []).append((bp_id, mode))
+            else:
+                check, mask = details
+                conditions.append((bp_id, text, check, mask))
+                watch_mask |= mask
+
+        interest = bytearray(IMEM_SIZE + 1)
+        for addr, instr in enumerate(imem):
+            if instr is None:
+                continue
+            flags = BREAK if addr in breaks else 0
+            if instr.dst_mask & watch_mask or (mem_watches and instr.op == Op.SW):
+                flags |= WATCH
+            interest[addr] = flags
+        self.interest = interest
+        self.breaks, self.reg_watches, self.mem_watches, self.conditions = \
+            breaks, reg_watches, mem_watches, conditions
+        self._imem = imem
+
+    # --- run_until_break tarafından işaretli komutlar için çağrılır ---
+    def _before(self, cpu, instr):
+        for bp_id, text, check in self.breaks[instr.addr]:
+            if check is None or check(cpu.regs):
+                return f"Breakpoint {bp_id} ({text}) at {instr.addr}: {instr.text}"
+        return None
+
+    def _capture(self, cpu, instr):
+        # Yürütmeden önceki değerler ("change" kipi için)
+        old_reg = cpu.regs[instr.rd] if instr.rd > 0 else None
+        mem_addr = old_mem = None
+        if instr.op == Op.SW:
+            mem_addr = (cpu.regs[instr.rs] + instr.imm) & cpu.addr_mask
+            if mem_addr in self.mem_watches:
+                old_mem = cpu.read_word(mem_addr)
+        return old_reg, mem_addr, old_mem
+
+    def _after(self, cpu, instr, captured):
+        old_reg, mem_addr, old_mem = captured
+        where = f"at {instr.addr}: {instr.text}"
+        if old_reg is not None:
+            new = cpu.regs[instr.rd]
+            for bp_id, mode in self.reg_watches.get(instr.rd, ()):
+                if mode == "write" or new != old_reg:
+                    return f"Watchpoint {bp_id}: {REG_NAMES[instr.rd]} = {new} (was {old_reg}) {where}"
+            for bp_id, text, check, mask in self.conditions:
+                if mask >> instr.rd & 1 and check(cpu.regs):
+                    return f"Condition {bp_id} ({text[3:]}) {where}"
+        if mem_addr in self.mem_watches:
+            new = cpu.read_word(mem_addr)
+            for bp_id, mode in self.mem_watches[mem_addr]:
+                if mode == "write" or new != old_mem:
+                    return f"Watchpoint {bp_id}: [{mem_addr}] = {new} (was {old_mem}) {where}"
+        return None
+
+    def run(self, cpu, max_cycles=None):
+        """CPU.run_until_break'in gövdesi: (cycle sayısı, hit açıklaması ya da None)."""
+        if cpu.mode != "pipeline":
+            raise ValueError("breakpoints only work in pipeline mode")
+        self.compile(cpu)
+        self.hit = None
+        interest = self.interest
+        pipeline = cpu.pipeline
+        step = cpu.step
+        limit = -1 if max_cycles is None else max_cycles
+        cycles = 0
+        while cycles != limit:
+            wb = pipeline["WB"]
+            flags = 0 if cpu.wb_retired else interest[wb.addr]
+            if flags:
+                # Durulan breakpoint'ten devam ederken aynı komutta tekrar durma
+                if flags & BREAK and cpu.total_cycles != self.stop_cycle:
+                    self.hit = self._before(cpu, wb)
+                    if self.hit:
+                        self.stop_cycle = cpu.total_cycles
+                        break
+                captured = self._capture(cpu, wb) if flags & WATCH else None
+                if not step():
+                    break
+                cycles += 1
+                if captured is not None:
+                    self.hit = self._after(cpu, wb, captured)
+                    if self.hit:
+                        break
+            elif step():
+                cycles += 1
+            else:
+                break
+        return cycles, self.hit
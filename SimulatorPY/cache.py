@@ -0,0 +1,161 @@
+import struct
+from array import array
+
+REPLACEMENT_POLICIES = ("lru", "fifo", "random")
+_STATS = struct.Struct(">QQQQQQQQQ")
+
+
+class Cache:
+    """Set-associative cache zamanlama modeli (veri CPU.memory'de kalır).
+
+    cpu.icache / cpu.dcache = Cache(...) ile açılır. Boyutlar byte'tır ve
+    2'nin kuvveti olmalıdır. Tag deposu set * ways uzunluğunda düz bir
+    array'dir; adres çözme önceden hesaplanmış shift/maske ile yapılır.
+
+    write_back=True: write-allocate, kirli satır atılırken miss_penalty
+    kadar ek bekleme. write_back=False: write-through, no-write-allocate;
+    her yazma write_penalty kadar bekler (0: yazma tamponu var sayılır).
+    access() bekleme cycle sayısını döndürür (isabette 0).
+    """
+
+    def __init__(self, size=256, assoc=1, line_size=8, replacement="lru", write_back=True,
+                 miss_penalty=10, write_penalty=0):
+        for name, val in (("size", size), ("assoc", assoc), ("line_size", line_size)):
+            if val < 1 or val & (val - 1):
+                raise ValueError(f"{name} must be a power of two")
+        if line_size < 2 or size < line_size * assoc:
+            raise ValueError("size must hold at least one set of line_size * assoc bytes")
+        if replacement not in REPLACEMENT_POLICIES:
+            raise ValueError(f"replacement must be one of {REPLACEMENT_POLICIES}")
+        self.size = size
+        self.assoc = assoc
+        self.line_size = line_size
+        self.replacement = replacement
+        self.write_back = write_back
+        self.miss_penalty = miss_penalty
+        self.write_penalty = write_penalty
+
+        sets = size // (line_size * assoc)
+        self.offset_bits = line_size.bit_length() - 1
+        self.index_bits = sets.bit_length() - 1
+        self.set_mask = sets - 1
+        self.reset()
+
+    def reset(self):
+        lines = self.size // self.line_size
+        self.tags = array("q", [-1] * lines)  # "q": snapshot boyutu platformdan bağımsız
+        self.stamps = array("q", [0] * lines)  # LRU: son erişim, FIFO: dolum zamanı
+        self.dirty = bytearray(lines)
+        self.clock = 0
+        self.seed = 1  # "random" için deterministik LCG (checkpoint'ler tekrar üretebilsin)
+        self.accesses = self.hits = self.misses = self.evictions = 0
+        self.writebacks = self.write_throughs = 0
+        self.stall_cycles = 0
+
+    def access(self, addr, write=False):
+        self.accesses += 1
+        self.clock += 1
+        line = addr >> self.offset_bits
+        tag = line >> self.index_bits
+        base = (line & self.set_mask) * self.assoc
+        end = base + self.assoc
+        tags = self.tags
+
+        if write and not self.write_back:
+            self.write_throughs += 1
+            wait = self.write_penalty
+        else:
+            wait = 0
+
+        for way in range(base, end):
+            if tags[way] == tag:
+                self.hits += 1
+                if self.replacement == "lru":
+                    self.stamps[way] = self.clock
+                if write and self.write_back:
+                    self.dirty[way] = 1
+                self.stall_cycles += wait
+                return wait
+
+        self.misses += 1
+        if write and not self.write_back:
+            # no-write-allocate: satır getirilmez, sadece belleğe yazılır
+            self.stall_cycles += wait
+            return wait
+
+        wait += self.miss_penalty
+        victim = self._victim(base, end)
+        if tags[victim] >= 0:
+            self.evictions += 1
+            if self.dirty[victim]:
+                self.writebacks += 1
+                wait += self.miss_penalty
+        tags[victim] = tag
+        self.stamps[victim] = self.clock
+        self.dirty[victim] = write
+        self.stall_cycles += wait
+        return wait
+
+    def _victim(self, base, end):
+        tags = self.tags
+        for way in range(base, end):
+            if tags[way] < 0:
+                return way
+        if self.replacement == "random":
+            self.seed = (self.seed * 1103515245 + 12345) & 0x7FFFFFFF
+            return base + (self.seed >> 16) % self.assoc
+        stamps = self.stamps
+        victim = base
+        for way in range(base + 1, end):
+            if stamps[way] < stamps[victim]:
+                victim = way
+        return victim
+
+    def metrics(self, name):
+        rate = self.hits / self.accesses if self.accesses else 0
+        return {
+            f"{name} Hits": self.hits,
+            f"{name} Misses": self.misses,
+            f"{name} Evictions": self.evictions,
+            f"{name} Writebacks": self.writebacks,
+            f"{name} Hit Rate": round(100 * rate, 2),
+            f"{name} Stall Cycles": self.stall_cycles,
+        }
+
+    # --- CPU.save_state/load_state için ---
+    def get_state(self):
+        return (_STATS.pack(self.clock, self.seed, self.accesses, self.hits, self.misses, self.evictions,
+                            self.writebacks, self.write_throughs, self.stall_cycles)
+                + self.tags.tobytes() + self.stamps.tobytes() + bytes(self.dirty))
+
+    def set_state(self, data):
+        lines = len(self.tags)
+        t, s = lines * self.tags.itemsize, lines * self.stamps.itemsize
+        if len(data) != _STATS.size + t + s + lines:
+            raise ValueError("cache state does not match this cache configuration")
+        (self.clock, self.seed, self.accesses, self.hits, self.misses, self.evictions,
+         self.writebacks, self.write_throughs, self.stall_cycles) = _STATS.unpack_from(data)
+        offset = _STATS.size
+        self.tags = array("q", data[offset:offset + t])
+        self.stamps = array("q", data[offset + t:offset + t + s])
+        self.dirty[:] = data[offset + t + s:]
+
+
+def parse_cache_spec(spec):
+    """Komut satırı tanımından Cache kurar: "size=256,assoc=2,line=8,repl=lru,write=back,penalty=10"."""
+    keys = {"size": "size", "assoc": "assoc", "line": "line_size", "repl": "replacement",
+            "write": "write_back", "penalty": "miss_penalty", "write_penalty": "write_penalty"}
+    kwargs = {}
+    for item in filter(None, spec.split(",")):
+        key, _, val = item.partition("=")
+        if key not in keys:
+            raise ValueError(f"unknown cache option {key!r} (expected {', '.join(keys)})")
+        if key == "repl":
+            kwargs["replacement"] = val
+        elif key == "write":
+            if val not in ("back", "through"):
+                raise ValueError("write must be 'back' or 'through'")
+            kwargs["write_back"] = val == "back"
+        else:
+            kwargs[keys[key]] = int(val, 0)
+    return Cache(**kwargs)
@@ -0,0 +1,105 @@
+import bisect
+
+EVICTION_POLICIES = ("oldest", "thin")
+
+
+class CheckpointRing:
+    """Periyodik CPU snapshot'ları ve bunlara dayanan geri sarma.
+
+    cpu.checkpoints = CheckpointRing(interval=10000) ile açılır; CPU.step her
+    interval cycle'da bir save_state() snapshot'ı alır. En fazla capacity
+    snapshot tutulur. Dolunca eviction="oldest" en eski snapshot'ı atar,
+    eviction="thin" ise her iki snapshot'tan birini atıp aralığı ikiye
+    katlar (tüm çalışma kapsanır, aralıklar seyrekleşir).
+
+    step_back/run_to_cycle hedefin öncesindeki en yakın snapshot'ı yükleyip
+    ileri doğru tekrar koşar. Tekrar koşu sırasında profiler ve tracer
+    devre dışıdır; snapshot'lar profiler sayaçlarını içermez.
+
+    Fonksiyonel modda total_cycles ilerlemez, bu yüzden CPU.set_mode her
+    mod değişiminde on_mode_switch'i çağırır: o cycle ve sonrasındaki
+    snapshot'lar atılır, pipeline'a dönüşte yeni bir snapshot alınır ve bir
+    mod değişimini aşan tekrar koşular reddedilir.
+    """
+
+    def __init__(self, interval=10000, capacity=64, eviction="oldest"):
+        if interval < 1 or capacity < 2:
+            raise ValueError("interval must be >= 1 and capacity >= 2")
+        if eviction not in EVICTION_POLICIES:
+            raise ValueError(f"eviction must be one of {EVICTION_POLICIES}")
+        self.base_interval = interval
+        self.capacity = capacity
+        self.eviction = eviction
+        self.clear()
+
+    def clear(self):
+        self.interval = self.base_interval
+        self.cycles = []  # sıralı snapshot cycle'ları
+        self.states = []
+        self.switches = []  # mod değişimlerinin cycle'ları (sıralı)
+        self.next_cycle = 0
+
+    def __len__(self):
+        return len(self.cycles)
+
+    # --- CPU.step tarafından çağrılır ---
+    def take(self, cpu):
+        cycle = cpu.total_cycles
+        self.next_cycle = cycle + self.interval
+        i = bisect.bisect_left(self.cycles, cycle)
+        if i < len(self.cycles) and self.cycles[i] == cycle:
+            return  # tekrar koşuda aynı noktadan geçildi
+        self.cycles.insert(i, cycle)
+        self.states.insert(i, cpu.save_state())
+        if len(self.cycles) > self.capacity:
+            self._evict()
+
+    # --- CPU.set_mode tarafından çağrılır ---
+    def on_mode_switch(self, cpu):
+        cycle = cpu.total_cycles
+        i = bisect.bisect_left(self.cycles, cycle)
+        del self.cycles[i:], self.states[i:]
+        del self.switches[bisect.bisect_left(self.switches, cycle):]
+        self.switches.append(cycle)
+        if cpu.mode == "pipeline":
+            self.take(cpu)
+
+    def _evict(self):
+        if self.eviction == "oldest":
+            del self.cycles[0], self.states[0]
+        else:
+            # İlk ve son snapshot kalır, aradakilerin yarısı atılır
+            del self.cycles[1:-1:2]
+            del self.states[1:-1:2]
+            self.interval *= 2
+            self.next_cycle = self.cycles[-1] + self.interval
+
+    # --- Geri sarma ---
+    def run_to_cycle(self, cpu, cycle):
+        """CPU'yu total_cycles == cycle olacak duruma getirir (program erken biterse orada durur)."""
+        if cpu.mode != "pipeline":
+            raise ValueError("checkpoints only work in pipeline mode")
+        if cycle < 0:
+            raise ValueError("cycle must be >= 0")
+        if cycle < cpu.total_cycles or (self.cycles and cpu.total_cycles < self.cycles[-1] <= cycle):
+            i = bisect.bisect_right(self.cycles, cycle) - 1
+            if i < 0:
+                raise ValueError(f"no checkpoint at or before cycle {cycle}")
+            # Snapshot ile hedef arasında fonksiyonel bir bölüm varsa tekrar koşu onu atlardı
+            j = bisect.bisect_right(self.switches, self.cycles[i])
+            if j < len(self.switches) and self.switches[j] <= cycle:
+                raise ValueError(f"cannot replay across the mode switch at cycle {self.switches[j]}")
+            cpu.load_state(self.states[i])
+            self.next_cycle = self.cycles[i] + self.interval
+
+        profiler, tracer, verbose = cpu.profiler, cpu.tracer, cpu.verbose
+        cpu.profiler = cpu.tracer = None
+        cpu.verbose = False
+        try:
+            cpu.run(max_cycles=cycle - cpu.total_cycles)
+        finally:
+            cpu.profiler, cpu.tracer, cpu.verbose = profiler, tracer, verbose
+        return cpu.total_cycles
+
+    def step_back(self, cpu, cycles=1):
+        return self.run_to_cycle(cpu, max(0, cpu.total_cycles - cycles))
@@ -0,0 +1,182 @@
+import bisect
+import mmap
+import sys
+
+from engine import WORD, BusError
+
+
+class DeviceBus:
+    """RAM'in üstündeki adres aralıklarını cihazlara yönlendiren veri yolu.
+
+    cpu.map_device(base, device) ile doldurulur; CPU, adresi len(cpu.memory)
+    ve üstünde olan lw/sw'leri buraya gönderir. Cihazlar size (byte) ile
+    read(cpu, offset) / write(cpu, offset, val) sağlar; offset word
+    hizalıdır. read yan etkisiz olmalıdır: EX'te çözülen tahminci ve
+    forwarding aynı lw'yi WB'den önce de okuyabilir. Erişim hataları
+    engine.BusError ile bildirilir; CPU bunları yutmaz, step/run'dan çıkar.
+    Cihaz içerikleri save_state snapshot'larına dahil değildir.
+    """
+
+    def __init__(self):
+        self.bases = []  # sıralı başlangıç adresleri
+        self.ranges = []  # (base, end, device)
+
+    def map(self, base, device):
+        end = base + device.size
+        if base & 1:
+            raise ValueError("device base address must be word aligned")
+        i = bisect.bisect_right(self.bases, base)
+        if (i > 0 and self.ranges[i - 1][1] > base) or (i < len(self.bases) and self.bases[i] < end):
+            raise ValueError(f"device at 0x{base:04X}-0x{end - 1:04X} overlaps another device")
+        self.bases.insert(i, base)
+        self.ranges.insert(i, (base, end, device))
+
+    def find(self, addr):
+        i = bisect.bisect_right(self.bases, addr) - 1
+        if i >= 0:
+            base, end, device = self.ranges[i]
+            if addr < end:
+                return device, addr - base
+        raise BusError(f"unmapped address 0x{addr:04X}")
+
+    def read(self, cpu, addr):
+        device, offset = self.find(addr)
+        return device.read(cpu, offset)
+
+    def write(self, cpu, addr, val):
+        device, offset = self.find(addr)
+        device.write(cpu, offset, val)
+
+    def close(self):
+        for _, _, device in self.ranges:
+            close = getattr(device, "close", None)
+            if close is not None:
+                close()
+
+
+class ConsoleDevice:
+    """Çıkış portu: +0'a yazılan word'ün alt byte'ı karakter, +2'ye yazılan
+    sayı ondalık olarak (satır sonuyla) stream'e yazılır. Okumalar 0 döner."""
+
+    size = 4
+
+    def __init__(self, stream=None):
+        self.stream = stream if stream is not None else sys.stdout
+
+    def read(self, cpu, offset):
+        return 0
+
+    def write(self, cpu, offset, val):
+        if offset == 0:
+            self.stream.write(chr(val & 0xFF))
+        else:
+            self.stream.write(f"{val}\n")
+
+
+class CycleCounterDevice:
+    """Salt okunur sayaçlar: +0/+2 cycle sayısının alt/üst word'ü, +4/+6
+    yürütülen komut sayısının alt/üst word'ü. Fonksiyonel modda cycle
+    ilerlemez; komut sayısı her run_functional çağrısının sonunda güncellenir."""
+
+    size = 8
+
+    def read(self, cpu, offset):
+        if offset < 4:
+            value = cpu.total_cycles
+        else:
+            value = cpu.executed_instr_count + cpu.functional_instr_count
+        if offset & 2:
+            value >>= 16
+        return cpu.to_signed_16(value)
+
+    def write(self, cpu, offset, val):
+        pass  # yazmalar yok sayılır
+
+
+class FileRAMDevice:
+    """Dosyaya mmap ile bağlanan RAM bölgesi (sıfır kopya, sayfalar ilk
+    erişimde okunur). writable=False iken yazmalar sadece bellekte kalır
+    (copy-on-write), True iken dosyaya yazılır.
+
+    window verilmezse dosyanın tamamı adres uzayına eşlenir. window
+    verilirse sadece window byte'lık bir pencere görünür ve pencereden
+    hemen sonraki word bank seçici register'dır: +offset erişimi dosyanın
+    bank * window + offset byte'ına gider. Böylece 16-bit adres uzayından
+    megabaytlarca veri okunabilir. Dosya sonunun ötesi 0 okunur.
+    """
+
+    def __init__(self, path, window=None, writable=False):
+        self.path = path
+        self.file = open(path, "r+b" if writable else "rb")
+        try:
+            access = mmap.ACCESS_WRITE if writable else mmap.ACCESS_COPY
+            self.data = mmap.mmap(self.file.fileno(), 0, access=access)
+        except (ValueError, OSError):
+            self.file.close()
+            raise
+        self.length = len(self.data)
+        if window is None:
+            self.window = self.length + (self.length & 1)
+            self.size = self.window
+        else:
+            if window < 2 or window & 1:
+                raise ValueError("window must be a positive even number of bytes")
+            self.window = window
+            self.size = window + 2  # + bank register
+        self.bank = 0
+
+    def _position(self, offset):
+        return self.bank * self.window + offset
+
+    def read(self, cpu, offset):
+        if offset == self.window:
+            return self.bank
+        pos = self._position(offset)
+        if pos + 2 <= self.length:
+            return WORD.unpack_from(self.data, pos)[0]
+        if pos < self.length:
+            return cpu.to_signed_16(self.data[pos] << 8)  # tek byte kalan son word
+        return 0
+
+    def write(self, cpu, offset, val):
+        if offset == self.window:
+            self.bank = val & 0xFFFF
+            return
+        pos = self._position(offset)
+        if pos + 2 > self.length:
+            raise BusError(f"write past the end of {self.path}")
+        WORD.pack_into(self.data, pos, cpu.to_signed_16(val))
+
+    def close(self):
+        self.data.close()
+        self.file.close()
+
+
+def parse_device_spec(spec):
+    """Komut satırı tanımından (base, cihaz) kurar.
+
+    "console@0xFF00", "counter@0xFF08", "file=data.bin@0x8000" ya da
+    "file=data.bin@0x8000,window=0x4000,rw".
+    """
+    kind, _, rest = spec.partition("@")
+    if not rest:
+        raise ValueError(f"device spec {spec!r} needs @BASE")
+    base, *options = rest.split(",")
+    base = int(base, 0)
+    kind, _, path = kind.partition("=")
+    if kind == "console" and not options:
+        return base, ConsoleDevice()
+    if kind == "counter" and not options:
+        return base, CycleCounterDevice()
+    if kind == "file" and path:
+        window, writable = None, False
+        for option in options:
+            key, _, val = option.partition("=")
+            if key == "window":
+                window = int(val, 0)
+            elif key == "rw" and not val:
+                writable = True
+            else:
+                raise ValueError(f"unknown file device option {option!r} (expected window=N, rw)")
+        return base, FileRAMDevice(path, window, writable)
+    raise ValueError(f"bad device spec {spec!r} (expected console@BASE, counter@BASE or file=PATH@BASE)")
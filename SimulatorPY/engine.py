@@ -1,21 +1,302 @@
+import struct
+import zlib
+from array import array
+from collections.abc import MutableMapping
+from enum import IntEnum
+
+IMEM_SIZE = 512
+DEFAULT_MEMORY_SIZE = 1024
+REG_NAMES = tuple(f"R{i}" for i in range(8))
+WORD = struct.Struct(">h")  # bellekte 16-bit big-endian word
+
+# CPU.save_state biçimi: başlık + bellek (isteğe bağlı zlib ile) + dallanma
+# tahmincisi, I-cache ve D-cache durumları (varsa). Aşama kodu: komut
+# adresi, -1 Empty, -2 NOP/Flush, -3 Stall (ek alanda bekleyen komutun
+# adresi), -4 cache miss baloncuğu. Program (instruction memory) snapshot'a
+# dahil değildir; başka programa yüklenmesin diye sadece parmak izi
+# (program_fingerprint) tutulur.
+STATE_MAGIC = b"R16S"
+STATE_VERSION = 7
+STATE_HEADER = struct.Struct(">4sBBBBiQQQQQQQQQQQii8h10hIIIII")
+
+
+class BusError(ValueError):
+    """Eşlenmemiş adrese ya da cihazın kabul etmediği bir erişim (bkz. devices.py).
+
+    execute diğer hatalar gibi yutmaz: pipeline, fonksiyonel ve derlenmiş
+    modların hepsinde step/run'dan dışarı çıkar.
+    """
+
+
+class Op(IntEnum):
+    # Pipeline baloncukları (gerçek komut değil)
+    EMPTY = 0
+    NOP = 1
+    STALL = 2
+    # ISA
+    ADD = 3
+    SUB = 4
+    AND = 5
+    OR = 6
+    SLT = 7
+    ADDI = 8
+    LW = 9
+    SW = 10
+    J = 11
+    JAL = 12
+    JR = 13
+    BEQ = 14
+    BNE = 15
+    SLL = 16
+    SRL = 17
+    HALT = 18
+
+
+MNEMONICS = {op.name.lower(): op for op in Op if op > Op.STALL}
+MNEMONICS["nop"] = Op.NOP
+R_TYPE = (Op.ADD, Op.SUB, Op.AND, Op.OR, Op.SLT)
+BRANCHES = (Op.BEQ, Op.BNE)
+CONTROL = (Op.J, Op.JAL, Op.JR, Op.BEQ, Op.BNE, Op.HALT)
+PREDICTED = frozenset((Op.J, Op.JAL, Op.JR, Op.BEQ, Op.BNE))  # bkz. predictor.py
+# Yanlış tahmin (ya da tahminsiz alınan dallanma) başına boşa geçen cycle:
+# WB'de çözülünce WB'de bekleme cycle'ı + boşaltılan IF..MEM, EX'te IF/ID
+FLUSH_PENALTY_WB = 5
+FLUSH_PENALTY_EX = 2
+# Forwarding politikaları (bkz. CPU.detect_hazards):
+#   "load-use": her yerden forwarding var sayılır, sadece lw -> kullanım bekler
+#   "full":     Verilog'daki fwd_A/fwd_B gibi EX/MEM ve MEM/WB -> EX yolları,
+#               ayrıca MEM/WB -> MEM (sw verisi); lw'den sonra sw verisi beklemez
+#   "none":     forwarding yok; üretici WB'ye gelene kadar ID bekler
+FORWARDING_POLICIES = ("load-use", "full", "none")
+POPCOUNT = tuple(bin(i).count("1") for i in range(256))
+
+
+class Instr:
+    """Önceden çözülmüş (pre-decoded) komut kaydı.
+
+    rd hedef register'dır (-1: yazmaz), srcs ise okunan register'lar.
+    text sadece ekranda göstermek için tutulur. *_mask alanları hazard
+    kontrolü için decode'da hesaplanan register bit maskeleridir (R0 hariç):
+    src_mask okunanlar, ex_mask EX'te gerekenler (sw verisi MEM'de gerekir),
+    dst_mask yazılan, load_mask ise lw'nin yazdığı register.
+    """
+    __slots__ = ("op", "rd", "rs", "rt", "imm", "target", "srcs", "addr", "text",
+                 "src_mask", "ex_mask", "dst_mask", "load_mask")
+
+    def __init__(self, op, rd=-1, rs=0, rt=0, imm=0, target=None, srcs=(), addr=-1, text=""):
+        self.op = op
+        self.rd = rd
+        self.rs = rs
+        self.rt = rt
+        self.imm = imm
+        self.target = target
+        self.srcs = srcs
+        self.addr = addr
+        self.text = text
+        self.src_mask = self.ex_mask = self.dst_mask = self.load_mask = 0
+
+    def __str__(self):
+        return self.text
+
+    def __repr__(self):
+        return f"Instr({self.op.name}, {self.text!r}, addr={self.addr})"
+
+
+EMPTY = Instr(Op.EMPTY, text="Empty")
+FLUSH = Instr(Op.NOP, text="NOP (Flush)")
+MISS = Instr(Op.NOP, text="NOP (Cache Miss)")
+
+
+def parse_reg(token):
+    token = token.strip()
+    if len(token) == 2 and token[0] in "Rr" and token[1] in "01234567":
+        return int(token[1])
+    raise ValueError(f"Invalid register: {token!r}")
+
+
+def decode(text, addr, labels):
+    """Tek satırlık assembly metnini Instr kaydına çevirir."""
+    parts = text.replace(",", " ").split()
+    name = parts[0].lower()
+    if name not in MNEMONICS:
+        raise ValueError(f"Unknown instruction: {parts[0]!r}")
+    op = MNEMONICS[name]
+    args = parts[1:]
+    ins = Instr(op, addr=addr, text=text)
+
+    if op in R_TYPE:
+        ins.rd, ins.rs, ins.rt = parse_reg(args[0]), parse_reg(args[1]), parse_reg(args[2])
+        ins.srcs = (ins.rs, ins.rt)
+    elif op == Op.ADDI:
+        ins.rd, ins.rs, ins.imm = parse_reg(args[0]), parse_reg(args[1]), int(args[2])
+        ins.srcs = (ins.rs,)
+    elif op in (Op.SLL, Op.SRL):
+        ins.rd, ins.rs, ins.imm = parse_reg(args[0]), parse_reg(args[1]), int(args[2])
+        ins.srcs = (ins.rs,)
+    elif op in (Op.LW, Op.SW):
+        # lw R1, 4(R2)
+        offset, base = args[1].replace(")", "").split("(")
+        ins.rs, ins.imm = parse_reg(base), int(offset)
+        if op == Op.LW:
+            ins.rd = parse_reg(args[0])
+            ins.srcs = (ins.rs,)
+        else:
+            ins.rt = parse_reg(args[0])
+            ins.srcs = (ins.rs, ins.rt)
+    elif op == Op.J:
+        ins.target = labels.get(args[0])
+    elif op == Op.JAL:
+        ins.rd = parse_reg(args[0])
+        ins.target = labels.get(args[1])
+    elif op == Op.JR:
+        ins.rs = parse_reg(args[0])
+        ins.srcs = (ins.rs,)
+    elif op in BRANCHES:
+        ins.rs, ins.rt = parse_reg(args[0]), parse_reg(args[1])
+        ins.target = labels.get(args[2])
+        ins.srcs = (ins.rs, ins.rt)
+    return compute_masks(ins)
+
+
+def compute_masks(ins):
+    """Alanları dolu Instr'ın hazard maskelerini hesaplar (bkz. Instr)."""
+    for reg in ins.srcs:
+        ins.src_mask |= (1 << reg) & ~1
+    ins.ex_mask = (1 << ins.rs) & ~1 if ins.op == Op.SW else ins.src_mask
+    ins.dst_mask = (1 << ins.rd) & ~1 if ins.rd > 0 else 0
+    ins.load_mask = ins.dst_mask if ins.op == Op.LW else 0
+    return ins
+
+
+def program_fingerprint(instruction_memory):
+    """Çözülmüş programın CRC32'si (text hariç: image'dan ve metinden yüklenen aynıdır)."""
+    fields = [(i.addr, int(i.op), i.rd, i.rs, i.rt, i.imm, i.target)
+              for i in instruction_memory if i is not None]
+    return zlib.crc32(repr(fields).encode())
+
+
+def address_mask(memory_size):
+    # Bellek boyutu 2'nin kuvveti olmalı: adresler maske ile sarılır
+    if memory_size < 2 or memory_size > 0x10000 or memory_size & (memory_size - 1):
+        raise ValueError("memory_size must be a power of two between 2 and 65536")
+    return (memory_size - 1) & ~1
+
+
+def parse_program(raw_code):
+    """Assembly metnini (instruction_memory, labels) ikilisine çevirir."""
+    labels = {}
+    lines = raw_code.strip().split("\n")
+    temp_instructions = []
+    for line_no, line in enumerate(lines, 1):
+        line = line.split("#")[0].strip()
+        if not line: continue
+        if ":" in line:
+            label_part, instr_part = line.split(":", 1)
+            labels[label_part.strip()] = len(temp_instructions)
+            line = instr_part.strip()
+        if line:
+            temp_instructions.append((line_no, line))
+    # Decode: label'lar artık bilindiği için hedefler de çözülebilir
+    instruction_memory = [None] * IMEM_SIZE
+    for i, (line_no, instr) in enumerate(temp_instructions[:IMEM_SIZE]):
+        try:
+            instruction_memory[i] = decode(instr, i, labels)
+        except (ValueError, IndexError) as e:
+            raise ValueError(f"Line {line_no}: {instr!r}: {e}") from None
+    return instruction_memory, labels
+
+
+class RegisterView(MutableMapping):
+    """Register dosyasına registers["R3"] şeklinde isimle erişim (GUI uyumluluğu)."""
+    __slots__ = ("_regs",)
+
+    def __init__(self, regs):
+        self._regs = regs
+
+    def _index(self, key):
+        if isinstance(key, int):
+            return key
+        try:
+            return REG_NAMES.index(key)
+        except ValueError:
+            raise KeyError(key) from None
+
+    def __getitem__(self, key):
+        return self._regs[self._index(key)]
+
+    def __setitem__(self, key, val):
+        i = self._index(key)
+        if i != 0:
+            self._regs[i] = val
+
+    def __delitem__(self, key):
+        raise TypeError("registers cannot be deleted")
+
+    def __iter__(self):
+        return iter(REG_NAMES)
+
+    def __len__(self):
+        return len(REG_NAMES)
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+
 class CPU:
-    def __init__(self):
-        self.registers = {f"R{i}": 0 for i in range(8)}
-        self.memory = [0] * 1024
-        self.instruction_memory = [""] * 512
+    def __init__(self, memory_size=DEFAULT_MEMORY_SIZE, address_space=None):
+        # address_space > memory_size: RAM'in üstü cihazlara ayrılır (bkz. map_device)
+        self.address_space = memory_size if address_space is None else address_space
+        if self.address_space < memory_size:
+            raise ValueError("address_space must be at least memory_size")
+        address_mask(memory_size)  # RAM boyutunu doğrular
+        self.addr_mask = address_mask(self.address_space)  # word hizalı adres maskesi
+        self.regs = array("h", [0] * 8)  # numarayla indekslenen register dosyası
+        self.registers = RegisterView(self.regs)
+        self.memory = bytearray(memory_size)
+        self.bus = None  # bkz. devices.DeviceBus; RAM dışı adresler
+        self.instruction_memory = [None] * IMEM_SIZE
+        self._fingerprint = (None, 0)  # (instruction_memory, program_fingerprint'i); bkz. save_state
         self.executed_instr_count = 0
         self.pc = 0
         self.labels = {}
         self.pipeline = {
-            "IF": "Empty",
-            "ID": "Empty",
-            "EX": "Empty",
-            "MEM": "Empty",
-            "WB": "Empty"
+            "IF": EMPTY,
+            "ID": EMPTY,
+            "EX": EMPTY,
+            "MEM": EMPTY,
+            "WB": EMPTY
         }
         self.total_cycles = 0
         self.stall_count = 0
         self.hazards = []
+        self.verbose = True  # flush mesajlarını konsola yaz
+        self.mode = "pipeline"  # "pipeline" (cycle-accurate) veya "functional"
+        self.wb_retired = False  # WB'deki komut zaten yürütüldü mü (jump cycle'ı)
+        self.functional_instr_count = 0
+        self.forwarding = "load-use"  # bkz. FORWARDING_POLICIES, set_forwarding
+        self.forwarded_ex_mem = 0  # EX/MEM -> EX yolundan gelen operand sayısı
+        self.forwarded_mem_wb = 0  # MEM/WB -> EX yolundan gelen operand sayısı
+        self.translator = None  # fonksiyonel mod için basic block derleyicisi
+        self.profiler = None  # bkz. profiler.Profiler; None iken maliyeti yok
+        self.tracer = None  # bkz. tracing.TraceWriter; cycle başına iz kaydı
+        self.checkpoints = None  # bkz. checkpoint.CheckpointRing; periyodik snapshot
+        self.breakpoints = None  # bkz. breakpoints.BreakpointSet; run_until_break
+        self.predictor = None  # bkz. predictor.BranchPredictor; None: WB'de çözülür, tahmin yok
+        self.branch_target = None  # tahminci açıkken execute'un bulduğu hedef
+        self.branch_predictions = 0
+        self.branch_mispredictions = 0
+        self.taken_transfers = 0
+        self.flush_penalty_cycles = 0
+        self.icache = None  # bkz. cache.Cache; None: sıfır gecikmeli bellek
+        self.dcache = None
+        self.mem_wait = 0  # D-cache miss'i için MEM'de kalan bekleme (-1: bekleme bitti)
+        self.fetch_wait = 0  # I-cache miss'i için IF'te kalan bekleme (-1: bekleme bitti)
+        self.cache_stall_cycles = 0  # D-cache yüzünden donan cycle'lar
+        # Değişiklik takibi (GUI'nin sadece değişen widget'ları çizmesi için)
+        self.track_changes = False
+        self.dirty_regs = set()
+        self.dirty_mem = set()
+        self._seen_pipeline = dict(self.pipeline)
 
     def to_signed_16(self, val):
         val &= 0xFFFF
@@ -27,61 +308,112 @@ class CPU:
         return val
 
     def load_program(self, raw_code):
+        self.load_decoded(*parse_program(raw_code))
+
+    def load_decoded(self, instruction_memory, labels):
+        """Önceden çözülmüş programı yükler (bkz. assembler.load_image)."""
         self.reset()
-        lines = raw_code.strip().split("\n")
-        temp_instructions = []
-        for line in lines:
-            line = line.split("#")[0].strip()
-            if not line: continue
-            if ":" in line:
-                label_part, instr_part = line.split(":", 1)
-                self.labels[label_part.strip()] = len(temp_instructions)
-                line = instr_part.strip()
-            if line:
-                temp_instructions.append(line)
-        for i, instr in enumerate(temp_instructions):
-            if i < 512:
-                self.instruction_memory[i] = instr
+        self.instruction_memory, self.labels = instruction_memory, labels
 
     def reset(self):
-        self.registers = {f"R{i}": 0 for i in range(8)}
+        for i in range(8):
+            self.regs[i] = 0
         self.pc = 0 
-        self.pipeline = {s: "Empty" for s in self.pipeline}
+        self.pipeline = {s: EMPTY for s in self.pipeline}
         self.total_cycles = 0
         self.stall_count = 0
         self.executed_instr_count = 0
         self.hazards = []
+        self.mode = "pipeline"
+        self.wb_retired = False
+        self.functional_instr_count = 0
+        self.forwarded_ex_mem = 0
+        self.forwarded_mem_wb = 0
+        self.branch_target = None
+        self.branch_predictions = 0
+        self.branch_mispredictions = 0
+        self.taken_transfers = 0
+        self.flush_penalty_cycles = 0
+        self.mem_wait = self.fetch_wait = 0
+        self.cache_stall_cycles = 0
+        if self.predictor is not None:
+            self.predictor.reset()
+        for cache in (self.icache, self.dcache):
+            if cache is not None:
+                cache.reset()
+        if self.profiler is not None:
+            self.profiler.reset()
+        if self.checkpoints is not None:
+            self.checkpoints.clear()
 
     def is_finished(self):
         for stage_content in self.pipeline.values():
-            content_str = str(stage_content["text"]) if isinstance(stage_content, dict) else str(stage_content)
-            if content_str != "Empty" and "NOP" not in content_str and "Flush" not in content_str:
+            if stage_content.op > Op.NOP:
                 return False
-        if self.pc < 512 and self.instruction_memory[self.pc] != "":
+        if 0 <= self.pc < IMEM_SIZE and self.instruction_memory[self.pc] is not None:
             return False
         return True
 
     def step(self):
+        if self.mode == "functional":
+            return self.run_functional(1) == 1
         if self.is_finished():
             return False
-        
+        if self.checkpoints is not None and self.total_cycles >= self.checkpoints.next_cycle:
+            self.checkpoints.take(self)
+        self._cycle()
+        if self.tracer is not None:
+            self.tracer.on_cycle(self)
+        return True
+
+    def _cycle(self):
         # 1. WB aşamasındaki komutu yürüt
         wb_content = self.pipeline["WB"]
-        jump_occurred = False
+        prof = self.profiler
+        if prof is not None:
+            prof.on_cycle(wb_content, self.wb_retired)
         
-        if wb_content != "Empty" and "NOP" not in str(wb_content):
+        if wb_content.op > Op.STALL and not self.wb_retired:
             old_pc = self.pc
             self.execute(wb_content)
-            
+            if prof is not None:
+                prof.on_execute(wb_content)
+            if self.predictor is not None:
+                redirected = wb_content.op in CONTROL and self._resolve_wb(wb_content)
+            else:
+                redirected = self.pc != old_pc
+
             # Eğer PC değiştiyse (Jump/Branch olduysa) 
             # Pipeline zaten execute içinde flush_pipeline() ile temizlendi.
-            if self.pc != old_pc:
-                jump_occurred = True
+            # Bu cycle'da kaydırma yapma, direkt bitir. Komut WB'de görünmeye
+            # devam eder ama bir sonraki cycle'da tekrar yürütülmez.
+            if redirected:
+                if prof is not None:
+                    prof.flush_owner = wb_content.addr
+                self.wb_retired = True
+                self.total_cycles += 1
+                return
+        self.wb_retired = False
 
-        # Eğer zıplama olduysa, bu cycle'da kaydırma yapma, direkt bitir.
-        if jump_occurred:
-            self.total_cycles += 1
-            return True
+        # D-cache: MEM'deki lw/sw miss olduysa MEM ve öncesi bekler, WB'ye baloncuk
+        mem = self.pipeline["MEM"]
+        if self.dcache is not None and (mem.op == Op.LW or mem.op == Op.SW):
+            if self.mem_wait == 0:
+                addr = (self.regs[mem.rs] + mem.imm) & self.addr_mask
+                if addr < len(self.memory):  # cihaz erişimleri cache'lenmez
+                    self.mem_wait = self.dcache.access(addr, mem.op == Op.SW)
+            if self.mem_wait > 0:
+                self.mem_wait = self.mem_wait - 1 or -1
+                self.cache_stall_cycles += 1
+                self.total_cycles += 1
+                self.pipeline["WB"] = MISS
+                return
+            self.mem_wait = 0
+
+        # EX'te çözüm: yanlış tahminde sadece IF/ID boşaltılır
+        predictor = self.predictor
+        if predictor is not None and predictor.resolve_in_ex and self.pipeline["EX"].op in PREDICTED:
+            self._resolve_ex(self.pipeline["EX"])
 
         # 2. Hazard Kontrolü
         hazard_result = self.detect_hazards()
@@ -89,14 +421,15 @@ class CPU:
         # --- STALL DURUMU ---
         if hazard_result == "STALL":
             self.stall_count += 1
+            if prof is not None:
+                prof.on_stall(self.pipeline["ID"])
             self.total_cycles += 1
             self.pipeline["WB"] = self.pipeline["MEM"]
             self.pipeline["MEM"] = self.pipeline["EX"]
             
-            id_pkg = self.pipeline["ID"]
-            waiting_instr = id_pkg["text"] if isinstance(id_pkg, dict) else str(id_pkg)
-            self.pipeline["EX"] = {"text": f"STALL (Wait: {waiting_instr})", "addr": -1}
-            return True
+            waiting = self.pipeline["ID"]
+            self.pipeline["EX"] = Instr(Op.STALL, target=waiting.addr, text=f"STALL (Wait: {waiting.text})")
+            return
 
         # --- NORMAL AKIŞ (SHIFT) ---
         self.total_cycles += 1
@@ -106,191 +439,625 @@ class CPU:
         self.pipeline["EX"] = self.pipeline["ID"]
         self.pipeline["ID"] = self.pipeline["IF"]
 
+        # EX'e giren komutun operandları hangi forwarding yolundan geliyor
+        # (Verilog fwd_A/fwd_B: önce EX/MEM, sonra MEM/WB)
+        need = self.pipeline["EX"].ex_mask
+        if need and self.forwarding != "none":
+            from_mem = self.pipeline["MEM"].dst_mask & need
+            self.forwarded_ex_mem += POPCOUNT[from_mem]
+            self.forwarded_mem_wb += POPCOUNT[self.pipeline["WB"].dst_mask & need & ~from_mem]
+
         # 3. FETCH
-        if self.pc < 512 and self.instruction_memory[self.pc]:
-            instr_text = self.instruction_memory[self.pc]
-            self.pipeline["IF"] = {"text": instr_text, "addr": self.pc}
-            self.pc += 1
+        instr = self.instruction_memory[self.pc] if 0 <= self.pc < IMEM_SIZE else None
+        if instr is not None and self.icache is not None:
+            # I-cache miss: komut gelene kadar ID'ye baloncuk gider
+            if self.fetch_wait == 0:
+                self.fetch_wait = self.icache.access(self.pc << 1)
+            if self.fetch_wait > 0:
+                self.fetch_wait = self.fetch_wait - 1 or -1
+                self.pipeline["IF"] = MISS
+                return
+            self.fetch_wait = 0
+        if instr is not None:
+            self.pipeline["IF"] = instr
+            if predictor is not None and instr.op in PREDICTED:
+                self.pc = predictor.predict(instr)
+            else:
+                self.pc += 1
         else:
-            self.pipeline["IF"] = "Empty"
+            self.pipeline["IF"] = EMPTY
         
-        return True
+        return
 
-    def detect_hazards(self):
-        id_pkg = self.pipeline["ID"]
-        ex_pkg = self.pipeline["EX"]
-        mem_pkg = self.pipeline["MEM"]
+    def run(self, max_cycles=None, until=None):
+        """Ekransız, tam hızda çalıştırır.
+
+        Program bitince, max_cycles cycle dolunca ya da until(cpu) True
+        döndürünce durur. Çalıştırılan cycle sayısını döndürür.
+        """
+        if self.mode == "functional" and until is None:
+            return self.run_functional(max_cycles)
+        step = self.step
+        limit = -1 if max_cycles is None else max_cycles
+        cycles = 0
+        if until is None:
+            while cycles != limit and step():
+                cycles += 1
+        else:
+            while cycles != limit and step():
+                cycles += 1
+                if until(self):
+                    break
+        return cycles
+
+    def run_until_break(self, max_cycles=None):
+        """run gibi çalıştırır, ayrıca self.breakpoints'e takılınca durur.
+
+        (çalıştırılan cycle sayısı, durma açıklaması ya da None) döndürür.
+        Tanımlı breakpoint yoksa doğrudan run kullanılır.
+        """
+        if not self.breakpoints:
+            return self.run(max_cycles), None
+        return self.breakpoints.run(self, max_cycles)
+
+    # --- FONKSİYONEL (ISA SEVİYESİ) MOD ---
+    def set_mode(self, mode):
+        """Pipeline ve fonksiyonel mod arasında durumu devreder.
 
-        if id_pkg == "Empty" or "NOP" in str(id_pkg) or "STALL" in str(id_pkg):
+        Fonksiyonel moda geçerken pipeline'daki henüz yürütülmemiş komutlar
+        atılır ve PC en eski yürütülmemiş komuta geri alınır. Pipeline moduna
+        geçerken pipeline boş başlar ve fetch PC'den devam eder.
+        """
+        if mode not in ("pipeline", "functional"):
+            raise ValueError(f"Unknown mode: {mode!r}")
+        if mode == self.mode:
+            return
+        if mode == "functional":
+            for stage in ["WB", "MEM", "EX", "ID", "IF"]:
+                instr = self.pipeline[stage]
+                if instr.op <= Op.STALL or (stage == "WB" and self.wb_retired):
+                    continue
+                self.pc = instr.addr
+                break
+        self.pipeline = {s: EMPTY for s in self.pipeline}
+        self.wb_retired = False
+        self.fetch_wait = self.mem_wait = 0
+        self.mode = mode
+        if self.checkpoints is not None:
+            self.checkpoints.on_mode_switch(self)
+
+    # --- DALLANMA TAHMİNİ ---
+    def _predicted_next(self, younger):
+        # Pipeline tahmin edilen yoldan sırayla dolar: ilk gerçek genç komut
+        # (yoksa fetch PC'si) tahmin edilen sonraki adrestir
+        for stage in younger:
+            addr = self.pipeline[stage].addr
+            if addr >= 0:
+                return addr
+        return self.pc
+
+    def _account(self, instr, actual, predicted):
+        self.branch_predictions += 1
+        if actual != predicted:
+            self.branch_mispredictions += 1
+        if actual != instr.addr + 1:
+            self.taken_transfers += 1
+        self.predictor.update(instr, actual)
+
+    def _resolve_wb(self, instr):
+        """WB'de yürütülen kontrol komutunu tahminle karşılaştırır; yönlendirdiyse True."""
+        actual = self.branch_target
+        self.branch_target = None
+        if actual is None:
+            actual = instr.addr + 1
+        predicted = self._predicted_next(("MEM", "EX", "ID", "IF"))
+        counted = instr.op != Op.HALT and not self.predictor.resolve_in_ex
+        if counted:
+            self._account(instr, actual, predicted)
+        if actual == predicted:
             return False
+        if counted:
+            self.flush_penalty_cycles += FLUSH_PENALTY_WB
+        self.pc = actual
+        self.flush_pipeline()
+        return True
 
-        instr_text = id_pkg["text"] if isinstance(id_pkg, dict) else str(id_pkg)
-        clean_id = instr_text.replace(",", " ").replace("(", " ").replace(")", " ")
-        parts = clean_id.split()
-        if len(parts) < 2: return False
-
-        op = parts[0].lower()
-        sources = []
-        if op in ["add", "sub", "and", "or", "slt"]: sources = [parts[2], parts[3]]
-        elif op in ["beq", "bne"]: sources = [parts[1], parts[2]]
-        elif op in ["addi", "lw", "sw"]: sources = [parts[2]]
-        elif op == "jr": sources = [parts[1]]
-
-        for stage_pkg in [ex_pkg, mem_pkg]:
-            if stage_pkg != "Empty" and "NOP" not in str(stage_pkg) and "STALL" not in str(stage_pkg):
-                stage_text = stage_pkg["text"] if isinstance(stage_pkg, dict) else str(stage_pkg)
-                clean_stage = stage_text.replace(",", " ").replace("(", " ").replace(")", " ")
-                s_parts = clean_stage.split()
-                
-                if len(s_parts) > 1:
-                    target = s_parts[1]
-                    target_op = s_parts[0].lower()
-                    if target in sources and target != "R0":
-                        # Load-Use Hazard Kontrolü
-                        if target_op == "lw" and stage_pkg == ex_pkg:
-                            return "STALL"
-        return False
-
-    def get_forwarded_value(self, reg_name):
-        if reg_name == "R0": return 0
-        # MEM ve WB'den forwarding kontrolü (Dinamik Register okuma)
-        return self.registers[reg_name]
-            
-    def execute(self, instr_pkg):
-        # NOP, Empty veya STALL durumlarında işlem yapma
-        if instr_pkg == "Empty" or "NOP" in str(instr_pkg) or "STALL" in str(instr_pkg):
+    def _resolve_ex(self, instr):
+        # Operandlar EX/MEM yolundan (MEM'deki henüz yürütülmemiş komut) ya da
+        # register dosyasından gelir; WB'deki komut bu cycle'da yürütüldü
+        op = instr.op
+        if op == Op.JR:
+            actual = self.ex_operand(instr.rs)
+        elif op in BRANCHES:
+            val_s, val_t = self.ex_operand(instr.rs), self.ex_operand(instr.rt)
+            taken = (val_s == val_t) if op == Op.BEQ else (val_s != val_t)
+            actual = instr.target if taken and instr.target is not None else instr.addr + 1
+        else:
+            actual = instr.target if instr.target is not None else instr.addr + 1
+        predicted = self._predicted_next(("ID", "IF"))
+        self._account(instr, actual, predicted)
+        if actual == predicted:
             return
+        self.flush_penalty_cycles += FLUSH_PENALTY_EX
+        self.pc = actual
+        self.pipeline["IF"] = self.pipeline["ID"] = FLUSH
+        self.fetch_wait = 0
+        if self.profiler is not None:
+            self.profiler.flush_owner = instr.addr
+        if self.verbose:
+            print(f"--- IF/ID FLUSHED AT PC: {self.pc} (resolved in EX) ---")
+
+    def ex_operand(self, reg):
+        """EX'teki komutun gördüğü register değeri (EX/MEM forwarding dahil)."""
+        mem = self.pipeline["MEM"]
+        if mem.dst_mask >> reg & 1:
+            return self.forward_result(mem)
+        return self.regs[reg]
 
-        self.executed_instr_count += 1
+    def forward_result(self, instr):
+        """Henüz WB'ye gelmemiş komutun rd'ye yazacağı değer (EX_MEM_alu_out)."""
+        op = instr.op
+        regs = self.regs
+        if op == Op.JAL:
+            return instr.addr + 1
+        if op == Op.LW:
+            return self.read_word((regs[instr.rs] + instr.imm) & self.addr_mask)
+        if op == Op.ADDI:
+            return self.to_signed_16(regs[instr.rs] + self.sign_extend_imm(instr.imm, 16))
+        if op == Op.SLL:
+            return self.to_signed_16(regs[instr.rs] << instr.imm)
+        if op == Op.SRL:
+            return self.to_signed_16((regs[instr.rs] & 0xFFFF) >> instr.imm)
+        val_s, val_t = regs[instr.rs], regs[instr.rt]
+        if op == Op.ADD: return self.to_signed_16(val_s + val_t)
+        if op == Op.SUB: return self.to_signed_16(val_s - val_t)
+        if op == Op.AND: return self.to_signed_16(val_s & val_t)
+        if op == Op.OR: return self.to_signed_16(val_s | val_t)
+        return 1 if val_s < val_t else 0
 
-        # Paket yapısından metni ve adresi çıkart
-        if isinstance(instr_pkg, dict):
-            instr_text = instr_pkg["text"]
-            instr_addr = instr_pkg["addr"]
+    def set_forwarding(self, policy):
+        """Hazard/forwarding donanım modelini seçer (bkz. FORWARDING_POLICIES)."""
+        if policy not in FORWARDING_POLICIES:
+            raise ValueError(f"Unknown forwarding policy: {policy!r}")
+        self.forwarding = policy
+
+    def run_functional(self, max_instructions=None, stop_pc=None):
+        """Pipeline'ı atlayarak komutları tek tek yürütür (hızlı ilerletme).
+
+        max_instructions komut yürütülünce ya da PC stop_pc'ye gelince durur.
+        Register'lar, bellek ve PC pipeline moduyla ortaktır. self.translator
+        atanmışsa (bkz. translator.BlockTranslator) derlenmiş basic block'lar
+        kullanılır. Yürütülen komut sayısını döndürür. BusError'da o ana
+        kadar yürütülenler sayılır ve PC hatalı komutta kalır.
+        """
+        if self.translator is not None:
+            count = self.translator.run(self, max_instructions, stop_pc)
         else:
-            instr_text = str(instr_pkg)
-            instr_addr = 0 
+            count = self._interpret(max_instructions, stop_pc)
+        self.functional_instr_count += count
+        return count
 
-        parts = instr_text.replace(",", " ").split()
-        if not parts: return
-        op = parts[0].lower()
+    def _interpret(self, max_instructions=None, stop_pc=None):
+        ADD, SUB, AND, OR, SLT = Op.ADD, Op.SUB, Op.AND, Op.OR, Op.SLT
+        ADDI, LW, SW, SLL, SRL = Op.ADDI, Op.LW, Op.SW, Op.SLL, Op.SRL
+        J, JAL, JR, BEQ, BNE, HALT = Op.J, Op.JAL, Op.JR, Op.BEQ, Op.BNE, Op.HALT
 
+        imem = self.instruction_memory
+        mem = self.memory
+        mask = self.addr_mask
+        ram = len(mem)  # üstü cihaz adresleri (read_word/write_word üzerinden)
+        unpack_from, pack_into = WORD.unpack_from, WORD.pack_into
+        # Sıcak döngüde list, array'den daha hızlı indekslenir; çıkışta geri yazılır
+        r = self.regs.tolist()
+        pc = self.pc
+        limit = -1 if max_instructions is None else max_instructions
+        count = 0
+        try:
+            while count != limit and pc != stop_pc and 0 <= pc < IMEM_SIZE:
+                ins = imem[pc]
+                if ins is None:
+                    break
+                pc += 1
+                count += 1
+                op = ins.op
+                # Sonuçlar ((v + 0x8000) & 0xFFFF) - 0x8000 ile 16-bit işaretliye çevrilir
+                if op == ADDI:
+                    if ins.rd > 0: r[ins.rd] = ((r[ins.rs] + ins.imm + 0x8000) & 0xFFFF) - 0x8000
+                elif op == ADD:
+                    if ins.rd > 0: r[ins.rd] = ((r[ins.rs] + r[ins.rt] + 0x8000) & 0xFFFF) - 0x8000
+                elif op == BNE:
+                    if r[ins.rs] != r[ins.rt] and ins.target is not None: pc = ins.target
+                elif op == BEQ:
+                    if r[ins.rs] == r[ins.rt] and ins.target is not None: pc = ins.target
+                elif op == LW:
+                    # Cihaz okuması R0'a yazılsa da yapılır: eşlenmemişse BusError
+                    a = (r[ins.rs] + ins.imm) & mask
+                    v = unpack_from(mem, a)[0] if a < ram else self.read_word(a)
+                    if ins.rd > 0: r[ins.rd] = v
+                elif op == SW:
+                    a = (r[ins.rs] + ins.imm) & mask
+                    if a < ram: pack_into(mem, a, r[ins.rt])
+                    else: self.write_word(a, r[ins.rt])
+                elif op == SUB:
+                    if ins.rd > 0: r[ins.rd] = ((r[ins.rs] - r[ins.rt] + 0x8000) & 0xFFFF) - 0x8000
+                elif op == SLT:
+                    if ins.rd > 0: r[ins.rd] = 1 if r[ins.rs] < r[ins.rt] else 0
+                elif op == AND:
+                    if ins.rd > 0: r[ins.rd] = r[ins.rs] & r[ins.rt]
+                elif op == OR:
+                    if ins.rd > 0: r[ins.rd] = r[ins.rs] | r[ins.rt]
+                elif op == SLL:
+                    if ins.rd > 0: r[ins.rd] = (((r[ins.rs] << ins.imm) + 0x8000) & 0xFFFF) - 0x8000
+                elif op == SRL:
+                    if ins.rd > 0: r[ins.rd] = ((((r[ins.rs] & 0xFFFF) >> ins.imm) + 0x8000) & 0xFFFF) - 0x8000
+                elif op == J:
+                    if ins.target is not None: pc = ins.target
+                elif op == JAL:
+                    if ins.target is not None:
+                        if ins.rd > 0: r[ins.rd] = ins.addr + 1
+                        pc = ins.target
+                elif op == JR:
+                    pc = r[ins.rs]
+                elif op == HALT:
+                    pc = IMEM_SIZE
+        except BusError:
+            # Pipeline gibi: hatalı komut yürütülmemiş sayılır ve PC onda kalır
+            pc = ins.addr
+            self.functional_instr_count += count - 1
+            raise
+        finally:
+            self.regs[1:] = array("h", r[1:])
+            self.pc = pc
+        return count
+
+    def fast_forward(self, instructions=None, pc=None):
+        """Fonksiyonel modda ilerleyip pipeline moduna geri döner.
+
+        Verilen komut sayısı kadar ya da PC verilen adrese gelene kadar
+        pipeline'sız çalışır; ardından cycle-accurate simülasyon kaldığı
+        yerden devam eder.
+        """
+        self.set_mode("functional")
+        count = self.run_functional(instructions, stop_pc=pc)
+        self.set_mode("pipeline")
+        return count
+
+    def detect_hazards(self):
+        # Decode'da hesaplanan bit maskeleriyle O(1) scoreboard kontrolü
+        id_instr = self.pipeline["ID"]
+        need = id_instr.src_mask
+        if not need:
+            return False
+
+        policy = self.forwarding
+        if policy == "none":
+            # Sonuç sadece register dosyasından okunur (WB'de yaz-önce-oku)
+            busy = self.pipeline["EX"].dst_mask | self.pipeline["MEM"].dst_mask
+        else:
+            # Load-Use: EX'teki lw'nin verisi ancak MEM sonunda hazır olur
+            busy = self.pipeline["EX"].load_mask
+            if policy == "full":
+                need = id_instr.ex_mask  # sw verisi MEM/WB -> MEM yoluyla gelir
+        return "STALL" if busy & need else False
+
+    def get_forwarded_value(self, reg):
+        if reg == 0: return 0
+        # MEM ve WB'den forwarding kontrolü (Dinamik Register okuma)
+        return self.regs[reg]
+            
+    def execute(self, instr):
+        # NOP, Empty veya STALL durumlarında işlem yapma
+        op = instr.op
+        if op <= Op.STALL:
+            return
+
+        regs = self.regs
         try:
             # --- ARİTMETİK VE MANTIKSAL İŞLEMLER ---
-            if op in ["add", "sub", "and", "or", "slt"]:
-                rd, rs, rt = parts[1], parts[2], parts[3]
+            if op in R_TYPE:
                 # Register yerine Forwarding biriminden en güncel veriyi alıyoruz
-                val_s = self.get_forwarded_value(rs)
-                val_t = self.get_forwarded_value(rt)
+                val_s = self.get_forwarded_value(instr.rs)
+                val_t = self.get_forwarded_value(instr.rt)
                 
-                if op == "add": res = val_s + val_t
-                elif op == "sub": res = val_s - val_t
-                elif op == "and": res = val_s & val_t
-                elif op == "or": res = val_s | val_t
-                elif op == "slt": res = 1 if val_s < val_t else 0
+                if op == Op.ADD: res = val_s + val_t
+                elif op == Op.SUB: res = val_s - val_t
+                elif op == Op.AND: res = val_s & val_t
+                elif op == Op.OR: res = val_s | val_t
+                else: res = 1 if val_s < val_t else 0
                 
-                if rd != "R0": self.registers[rd] = self.to_signed_16(res)
+                regs[instr.rd] = self.to_signed_16(res)
 
             # --- ADDI ---
-            elif op == "addi":
-                rt, rs, imm = parts[1], parts[2], int(parts[3])
-                res = self.get_forwarded_value(rs) + self.sign_extend_imm(imm, 16)
-                if rt != "R0": self.registers[rt] = self.to_signed_16(res)
+            elif op == Op.ADDI:
+                res = self.get_forwarded_value(instr.rs) + self.sign_extend_imm(instr.imm, 16)
+                regs[instr.rd] = self.to_signed_16(res)
 
             # --- LW / SW ---
-            elif op in ["lw", "sw"]:
-                rt = parts[1]
-                offset_reg = parts[2].replace(")", "").split("(")
-                offset = int(offset_reg[0])
-                rs = offset_reg[1]
-                addr = (self.get_forwarded_value(rs) + offset) & 0x3FE
+            elif op == Op.LW or op == Op.SW:
+                addr = (self.get_forwarded_value(instr.rs) + instr.imm) & self.addr_mask
                 
-                if op == "sw":
-                    val = self.get_forwarded_value(rt) # Kaydedilecek veriyi de forward et
-                    self.memory[addr] = (val >> 8) & 0xFF
-                    self.memory[addr + 1] = val & 0xFF
+                if op == Op.SW:
+                    val = self.get_forwarded_value(instr.rt) # Kaydedilecek veriyi de forward et
+                    self.write_word(addr, val)
+                    if self.track_changes and addr < len(self.memory):
+                        self.dirty_mem.add(addr)
+                    if self.tracer is not None:
+                        self.tracer.mem_write(addr, val)
                 else:
-                    loaded_val = (self.memory[addr] << 8) | self.memory[addr + 1]
-                    self.registers[rt] = self.to_signed_16(loaded_val)
+                    regs[instr.rd] = self.read_word(addr)
 
             # --- JUMP (j) ---
-            elif op == "j":
-                target = parts[1]
-                if target in self.labels:
-                    self.pc = self.labels[target]
-                    self.flush_pipeline()
+            elif op == Op.J:
+                if instr.target is not None:
+                    self.redirect(instr.target)
 
             # --- JUMP AND LINK (jal) ---
-            elif op == "jal":
+            elif op == Op.JAL:
                 # Örn: jal R7, my_func
-                rd, target = parts[1], parts[2]
-                if target in self.labels:
+                if instr.target is not None:
                     # R7'ye (veya rd'ye) JAL komutunun bir sonraki adresini kaydet
-                    self.registers[rd] = instr_addr + 1 
-                    self.pc = self.labels[target]
-                    self.flush_pipeline()
+                    regs[instr.rd] = instr.addr + 1
+                    self.redirect(instr.target)
 
             # --- JUMP REGISTER (jr) ---
-            elif op == "jr":
-                rs = parts[1]
+            elif op == Op.JR:
                 # Hedef adresi register'dan (veya forwarding biriminden) al
-                self.pc = self.get_forwarded_value(rs)
-                self.flush_pipeline()
+                self.redirect(self.get_forwarded_value(instr.rs))
 
             # --- BEQ / BNE ---
-            elif op in ["beq", "bne"]:
-                rs, rt, label = parts[1], parts[2], parts[3]
-                val_s = self.get_forwarded_value(rs)
-                val_t = self.get_forwarded_value(rt)
-                condition = (val_s == val_t) if op == "beq" else (val_s != val_t)
-                if condition and label in self.labels:
-                    self.pc = self.labels[label]
-                    self.flush_pipeline()
+            elif op in BRANCHES:
+                val_s = self.get_forwarded_value(instr.rs)
+                val_t = self.get_forwarded_value(instr.rt)
+                condition = (val_s == val_t) if op == Op.BEQ else (val_s != val_t)
+                if condition and instr.target is not None:
+                    self.redirect(instr.target)
 
             # --- SHIFT OPERATIONS ---
-            elif op == "sll":
+            elif op == Op.SLL:
                 # Sola Kaydır (SLL R1, R1, 1 -> R1'i 2 ile çarpmak gibidir)
-                rd, rs, shamt = parts[1], parts[2], int(parts[3])
-                res = self.get_forwarded_value(rs) << shamt
-                if rd != "R0": self.registers[rd] = self.to_signed_16(res)
+                res = self.get_forwarded_value(instr.rs) << instr.imm
+                regs[instr.rd] = self.to_signed_16(res)
 
-            elif op == "srl":
+            elif op == Op.SRL:
                 # Sağa Kaydır (SRL R1, R1, 1 -> R1'i 2'ye bölmek gibidir)
-                rd, rs, shamt = parts[1], parts[2], int(parts[3])
                 # Python'da sağa kaydırma işareti korur, ama 16-bit maskeleme ile SRL yapalım
-                val = self.get_forwarded_value(rs) & 0xFFFF
-                res = val >> shamt
-                if rd != "R0": self.registers[rd] = self.to_signed_16(res)
+                val = self.get_forwarded_value(instr.rs) & 0xFFFF
+                res = val >> instr.imm
+                regs[instr.rd] = self.to_signed_16(res)
 
             # --- HALT ---
-            elif op == "halt":
-                self.pc = 512
-                self.flush_pipeline()
+            elif op == Op.HALT:
+                self.redirect(IMEM_SIZE)
 
+        except BusError:
+            raise  # komut yürütülmemiş sayılır: WB'de kalır, tekrar denenirse yine yürütülür
         except Exception as e:
-            print(f"Execute Error ({op}): {e}")
+            print(f"Execute Error ({instr.text}): {e}")
+        else:
+            self.executed_instr_count += 1
+            if instr.rd > 0:
+                if self.track_changes:
+                    self.dirty_regs.add(instr.rd)
+                if self.tracer is not None:
+                    self.tracer.reg_write(instr.rd, regs[instr.rd])
         finally:
-            self.registers["R0"] = 0 # R0 her zaman 0 kalmalı
+            regs[0] = 0 # R0 her zaman 0 kalmalı
+
+    def redirect(self, target):
+        # Alınan kontrol transferi. Tahminci varsa karar _resolve_wb'de verilir
+        if self.predictor is not None:
+            self.branch_target = target
+            return
+        self.pc = target
+        self.flush_pipeline()
 
     def flush_pipeline(self):
         # Sadece henüz bitmemiş olan aşamaları temizle
         # WB'yi (Write-Back) temizlemiyoruz çünkü o an biten komutun 
         # sonucunun kaydedilmesi gerekiyor.
         for stage in ["IF", "ID", "EX", "MEM"]:
-            self.pipeline[stage] = {"text": "NOP (Flush)", "addr": -1}
+            self.pipeline[stage] = FLUSH
+        self.fetch_wait = self.mem_wait = 0
             
         # Debug için konsola yazdırabilirsin
-        print(f"--- PIPELINE FLUSHED AT PC: {self.pc} ---")
+        if self.verbose:
+            print(f"--- PIPELINE FLUSHED AT PC: {self.pc} ---")
+
+    def read_word(self, addr):
+        if addr < len(self.memory):
+            return WORD.unpack_from(self.memory, addr)[0]
+        if self.bus is None:
+            raise BusError(f"unmapped address 0x{addr:04X}")
+        return self.to_signed_16(self.bus.read(self, addr))
+
+    def write_word(self, addr, val):
+        if addr < len(self.memory):
+            WORD.pack_into(self.memory, addr, self.to_signed_16(val))
+        elif self.bus is None:
+            raise BusError(f"unmapped address 0x{addr:04X}")
+        else:
+            self.bus.write(self, addr, val)
+
+    # --- BELLEK VE CİHAZLAR ---
+    def map_device(self, base, device):
+        """Cihazı RAM'in üstünde base adresine bağlar (bkz. devices.py)."""
+        if base < len(self.memory) or base + device.size > self.address_space:
+            raise ValueError(f"device at 0x{base:04X} must lie between RAM "
+                             f"(0x{len(self.memory):04X}) and the end of the address space "
+                             f"(0x{self.address_space:04X})")
+        if self.bus is None:
+            from devices import DeviceBus
+            self.bus = DeviceBus()
+        self.bus.map(base, device)
+        return device
+
+    def load_memory(self, source, addr=0):
+        """Binary dosyayı (yol) ya da bytes'ı tek seferde addr'den itibaren RAM'e yükler.
+
+        Veri bellek düzeninde (big-endian word'ler) olmalıdır. Yüklenen byte
+        sayısını döndürür.
+        """
+        if not 0 <= addr <= len(self.memory):
+            raise ValueError(f"load address {addr} is outside memory")
+        view = memoryview(self.memory)[addr:]
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            count = len(source)
+            if count > len(view):
+                raise ValueError(f"{count} bytes at {addr} do not fit in {len(self.memory)} bytes of memory")
+            view[:count] = source
+            return count
+        with open(source, "rb") as f:
+            count = f.readinto(view)
+            if f.read(1):
+                raise ValueError(f"{source} does not fit in {len(self.memory)} bytes of memory at {addr}")
+        return count
+
+    def take_changes(self):
+        """Son çağrıdan beri değişenleri döndürür ve sıfırlar.
+
+        (yazılan register numaraları, sw ile yazılan word adresleri, içeriği
+        değişen pipeline aşamaları). track_changes açık olmalıdır.
+        """
+        regs, mem = self.dirty_regs, self.dirty_mem
+        self.dirty_regs, self.dirty_mem = set(), set()
+        stages = [s for s, instr in self.pipeline.items() if self._seen_pipeline.get(s) is not instr]
+        self._seen_pipeline = dict(self.pipeline)
+        return regs, mem, stages
+
+    # --- DURUM KAYDI ---
+    def program_id(self):
+        """Yüklü programın parmak izi; program değişmedikçe yeniden hesaplanmaz."""
+        imem, value = self._fingerprint
+        if imem is not self.instruction_memory:
+            value = program_fingerprint(self.instruction_memory)
+            self._fingerprint = (self.instruction_memory, value)
+        return value
+
+    def save_state(self, compress=False):
+        """Register, bellek, pipeline, PC ve sayaçları kompakt bir bytes'a yazar."""
+        stages = []
+        for instr in self.pipeline.values():
+            if instr.op == Op.STALL:
+                stages += (-3, instr.target)
+            elif instr is MISS:
+                stages += (-4, 0)
+            elif instr is EMPTY:
+                stages += (-1, 0)
+            else:
+                stages += (instr.addr if instr.addr >= 0 else -2, 0)
+        memory = zlib.compress(self.memory, 1) if compress else self.memory
+        extras = [unit.get_state() if unit is not None else b""
+                  for unit in (self.predictor, self.icache, self.dcache)]
+        header = STATE_HEADER.pack(
+            STATE_MAGIC, STATE_VERSION, self.mode == "functional", self.wb_retired, compress,
+            self.pc, self.total_cycles, self.stall_count, self.executed_instr_count,
+            self.functional_instr_count, self.forwarded_ex_mem, self.forwarded_mem_wb,
+            self.branch_predictions, self.branch_mispredictions, self.taken_transfers,
+            self.flush_penalty_cycles, self.cache_stall_cycles, self.mem_wait, self.fetch_wait,
+            *self.regs, *stages, len(memory), *map(len, extras), self.program_id())
+        return b"".join([header, memory, *extras])
+
+    def load_state(self, data):
+        """save_state çıktısını geri yükler. Aynı program yüklü olmalıdır.
+
+        Snapshot bozuksa ya da başka bir programa aitse ValueError verir.
+        """
+        fields = STATE_HEADER.unpack_from(data)
+        magic, version, functional, wb_retired, compressed, pc = fields[:6]
+        if magic != STATE_MAGIC or version != STATE_VERSION:
+            raise ValueError("not a RISC-16 state snapshot")
+        if fields[41] != self.program_id():
+            raise ValueError("state snapshot was saved with a different program")
+        imem = self.instruction_memory
+
+        def program_instr(addr):
+            if not 0 <= addr < IMEM_SIZE or imem[addr] is None:
+                raise ValueError(f"state snapshot refers to missing instruction {addr}")
+            return imem[addr]
+
+        stages = fields[27:37]
+        pipeline = {}
+        for i, stage in enumerate(self.pipeline):
+            code, aux = stages[2 * i], stages[2 * i + 1]
+            if code == -3:
+                pipeline[stage] = Instr(Op.STALL, target=aux, text=f"STALL (Wait: {program_instr(aux).text})")
+            elif code == -4:
+                pipeline[stage] = MISS
+            elif code == -1:
+                pipeline[stage] = EMPTY
+            elif code == -2:
+                pipeline[stage] = FLUSH
+            else:
+                pipeline[stage] = program_instr(code)
+        offset = STATE_HEADER.size
+        blobs = []
+        for length in fields[37:41]:
+            blobs.append(data[offset:offset + length])
+            if len(blobs[-1]) != length:
+                raise ValueError("truncated state snapshot")
+            offset += length
+        memory = zlib.decompress(blobs[0]) if compressed else blobs[0]
+        # Tahminci ve cache'ler snapshot'ı alan CPU'daki gibi yapılandırılmış olmalı
+        for unit, blob, name in zip((self.predictor, self.icache, self.dcache), blobs[1:],
+                                    ("a branch predictor", "an I-cache", "a D-cache")):
+            if unit is None:
+                if blob:
+                    raise ValueError(f"state snapshot needs {name}")
+            elif blob:
+                unit.set_state(blob)
+            else:
+                unit.reset()
+        if len(memory) != len(self.memory):
+            self.memory = bytearray(memory)
+            self.address_space = max(self.address_space, len(memory))
+            self.addr_mask = address_mask(self.address_space)
+        else:
+            self.memory[:] = memory
+
+        self.pipeline = pipeline
+        self.regs[:] = array("h", fields[19:27])
+        self.mode = "functional" if functional else "pipeline"
+        self.wb_retired = bool(wb_retired)
+        self.pc = pc
+        self.total_cycles, self.stall_count, self.executed_instr_count, self.functional_instr_count = fields[6:10]
+        self.forwarded_ex_mem, self.forwarded_mem_wb = fields[10:12]
+        (self.branch_predictions, self.branch_mispredictions, self.taken_transfers,
+         self.flush_penalty_cycles) = fields[12:16]
+        self.cache_stall_cycles, self.mem_wait, self.fetch_wait = fields[16:19]
+        self.branch_target = None
+        # GUI her şeyi yeniden çizsin
+        self.dirty_regs = set(range(8))
+        self._seen_pipeline = {}
 
     def get_memory_dump(self, limit=64):
         return {addr: self.memory[addr] for addr in range(limit)}
 
     def get_performance_metrics(self):
         cpi = self.total_cycles / self.executed_instr_count if self.executed_instr_count > 0 else 0
-        return {
+        metrics = {
             "Total Cycles": self.total_cycles,
             "Executed Instructions": self.executed_instr_count,
             "Stall Count": self.stall_count,
             "CPI": round(cpi, 2),
-            "IPC": round(1/cpi, 2) if cpi > 0 else 0
-        }
\ No newline at end of file
+            "IPC": round(1/cpi, 2) if cpi > 0 else 0,
+            "Fast-Forwarded Instructions": self.functional_instr_count,
+            "Forwarded Operands (EX/MEM)": self.forwarded_ex_mem,
+            "Forwarded Operands (MEM/WB)": self.forwarded_mem_wb,
+        }
+        if self.icache is not None:
+            metrics.update(self.icache.metrics("I-Cache"))
+        if self.dcache is not None:
+            metrics.update(self.dcache.metrics("D-Cache"))
+            metrics["Cache Stall Cycles"] = self.cache_stall_cycles
+        if self.predictor is not None:
+            predictions = self.branch_predictions
+            correct = predictions - self.branch_mispredictions
+            metrics.update({
+                "Branch Predictions": predictions,
+                "Mispredictions": self.branch_mispredictions,
+                "Prediction Accuracy": round(100 * correct / predictions, 2) if predictions else 0,
+                "Flush Cycles": self.flush_penalty_cycles,
+                # Tahminsiz, WB'de çözen modele göre (her alınan transfer bir tam flush)
+                "Flush Cycles Saved": FLUSH_PENALTY_WB * self.taken_transfers - self.flush_penalty_cycles,
+            })
+        return metrics
@@ -0,0 +1,201 @@
+import argparse
+import struct
+import sys
+import time
+import zlib
+
+import assembler
+from breakpoints import BreakpointSet
+from cache import parse_cache_spec
+from devices import parse_device_spec
+from engine import CPU, FORWARDING_POLICIES
+from predictor import DIRECTIONS, BranchPredictor
+from profiler import Profiler
+from tracing import TraceWriter
+from translator import BlockTranslator
+
+
+def print_state(cpu, mem_bytes):
+    print("Registers:")
+    for name, val in cpu.registers.items():
+        print(f"  {name}: {val:6d}  (0x{val & 0xFFFF:04X})")
+
+    print(f"Memory (first {mem_bytes} bytes, 16-bit words):")
+    for base in range(0, mem_bytes, 16):
+        words = []
+        for addr in range(base, min(base + 16, mem_bytes), 2):
+            words.append(f"{cpu.read_word(addr) & 0xFFFF:04X}")
+        print(f"  {base:04d}: {' '.join(words)}")
+
+    print("Performance:")
+    for key, val in cpu.get_performance_metrics().items():
+        print(f"  {key}: {val}")
+
+
+def load(cpu, path, cache_dir=None):
+    if path.endswith((".bin", ".hex", ".mem")):
+        assembler.load_image(cpu, assembler.read_image(path))
+        return
+    with open(path) as f:
+        source = f.read()
+    if cache_dir is not None:
+        try:
+            assembler.load_image(cpu, *assembler.assemble_cached(source, cache_dir))
+            return
+        except ValueError:
+            pass  # 16-bit biçime sığmayan program (ör. büyük immediate): metinden yükle
+    cpu.load_program(source)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="RISC-16 pipeline simulator (headless)")
+    parser.add_argument("program", help="assembly source (.asm) or machine-code image (.bin/.hex/.mem)")
+    parser.add_argument("--max-cycles", type=int, default=None, help="stop after this many cycles")
+    parser.add_argument("--memory-size", type=int, default=1024, help="data memory size in bytes (power of two)")
+    parser.add_argument("--address-space", type=lambda s: int(s, 0), default=None, metavar="BYTES",
+                        help="addressable bytes (power of two, up to 65536); the part above RAM is for --device")
+    parser.add_argument("--device", action="append", default=[], metavar="SPEC",
+                        help="map a device above RAM: console@BASE, counter@BASE, "
+                             "file=PATH@BASE[,window=N][,rw] (repeatable)")
+    parser.add_argument("--preload", default=None, metavar="FILE[@ADDR]",
+                        help="copy a binary file into RAM before running (default address 0)")
+    parser.add_argument("--mem", type=int, default=64, help="number of memory bytes to print")
+    parser.add_argument("--forwarding", choices=FORWARDING_POLICIES, default="load-use",
+                        help="hazard model: load-use stalls only, Verilog-style EX/MEM+MEM/WB paths, or none")
+    parser.add_argument("--predictor", choices=DIRECTIONS, default=None,
+                        help="predict control transfers at IF (default: none, every taken one flushes)")
+    parser.add_argument("--bht-size", type=int, default=64, help="counter table entries for 1bit/2bit")
+    parser.add_argument("--btb-size", type=int, default=16, help="jr target buffer entries (0 disables)")
+    parser.add_argument("--resolve", choices=("wb", "ex"), default="wb",
+                        help="stage where control transfers are resolved (ex needs --predictor)")
+    parser.add_argument("--icache", default=None, metavar="SPEC",
+                        help="instruction cache, e.g. size=256,assoc=2,line=8,repl=lru,penalty=10")
+    parser.add_argument("--dcache", default=None, metavar="SPEC",
+                        help="data cache, same keys plus write=back|through and write_penalty")
+    parser.add_argument("--functional", action="store_true", help="run without the pipeline model (ISA level only)")
+    parser.add_argument("--ff", type=int, default=None, metavar="N",
+                        help="fast-forward N instructions functionally before the pipeline run")
+    parser.add_argument("--ff-to", default=None, metavar="PC",
+                        help="fast-forward until the PC reaches this label or address")
+    parser.add_argument("--translate", action="store_true",
+                        help="use compiled basic blocks for functional execution")
+    parser.add_argument("--break", dest="breaks", action="append", default=[], metavar="SPEC",
+                        help="stop at an address/label (optionally 'if R3 > 100'), "
+                             "'watch R3|ADDR [change]' or 'if COND' (repeatable, pipeline mode)")
+    parser.add_argument("--profile", action="store_true", help="print a per-instruction hot-spot report")
+    parser.add_argument("--profile-out", default=None, metavar="FILE",
+                        help="write the flat profile as .json or .csv")
+    parser.add_argument("--trace", default=None, metavar="FILE",
+                        help="stream a per-cycle trace here (.gz compresses it); see tracing.py")
+    parser.add_argument("--load-state", default=None, metavar="FILE",
+                        help="resume from a state snapshot saved with --save-state (same program)")
+    parser.add_argument("--save-state", default=None, metavar="FILE",
+                        help="write the final CPU state as a compressed snapshot")
+    parser.add_argument("--cache-dir", default=None, metavar="DIR",
+                        help="cache assembled images here, keyed by source hash")
+    parser.add_argument("-v", "--verbose", action="store_true", help="print pipeline flush messages")
+    args = parser.parse_args(argv)
+
+    try:
+        cpu = CPU(memory_size=args.memory_size, address_space=args.address_space)
+        for spec in args.device:
+            cpu.map_device(*parse_device_spec(spec))
+    except (ValueError, OSError) as e:
+        parser.error(str(e))
+    cpu.verbose = args.verbose
+    cpu.set_forwarding(args.forwarding)
+    if args.predictor is not None:
+        cpu.predictor = BranchPredictor(args.predictor, args.bht_size, args.btb_size, args.resolve == "ex")
+    elif args.resolve == "ex":
+        parser.error("--resolve ex needs --predictor (use --predictor not-taken for plain early resolution)")
+    try:
+        if args.icache:
+            cpu.icache = parse_cache_spec(args.icache)
+        if args.dcache:
+            cpu.dcache = parse_cache_spec(args.dcache)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.breaks:
+        cpu.breakpoints = BreakpointSet()
+        try:
+            for spec in args.breaks:
+                cpu.breakpoints.add(spec)
+        except ValueError as e:
+            parser.error(str(e))
+    if args.translate:
+        cpu.translator = BlockTranslator()
+    if args.profile or args.profile_out:
+        cpu.profiler = Profiler()
+    try:
+        load(cpu, args.program, args.cache_dir)
+    except ValueError as e:
+        print(f"{args.program}: {e}", file=sys.stderr)
+        return 1
+    if args.preload:
+        path, _, addr = args.preload.rpartition("@") if "@" in args.preload else (args.preload, "", "0")
+        try:
+            cpu.load_memory(path, int(addr, 0))
+        except (ValueError, OSError) as e:
+            print(f"{args.preload}: {e}", file=sys.stderr)
+            return 1
+    if args.load_state:
+        try:
+            with open(args.load_state, "rb") as f:
+                cpu.load_state(f.read())
+        except (ValueError, struct.error, zlib.error) as e:
+            print(f"{args.load_state}: {e}", file=sys.stderr)
+            return 1
+
+    stop_pc = None
+    if args.ff_to is not None:
+        if args.ff_to in cpu.labels:
+            stop_pc = cpu.labels[args.ff_to]
+        else:
+            try:
+                stop_pc = int(args.ff_to, 0)
+            except ValueError:
+                parser.error(f"unknown label or address {args.ff_to!r}")
+
+    start = time.perf_counter()
+    if args.functional:
+        cpu.set_mode("functional")
+    if args.trace:
+        cpu.tracer = TraceWriter(args.trace)
+    hit = None
+    try:
+        if not args.functional and (args.ff is not None or stop_pc is not None):
+            cpu.fast_forward(args.ff, pc=stop_pc)
+        if cpu.breakpoints and cpu.mode == "pipeline":
+            cycles, hit = cpu.run_until_break(max_cycles=args.max_cycles)
+        else:
+            cycles = cpu.run(max_cycles=args.max_cycles)
+    except ValueError as e:
+        print(f"{args.program}: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if cpu.tracer is not None:
+            cpu.tracer.close()
+        if cpu.bus is not None:
+            cpu.bus.close()
+    elapsed = time.perf_counter() - start
+    if args.save_state:
+        with open(args.save_state, "wb") as f:
+            f.write(cpu.save_state(compress=True))
+
+    print_state(cpu, min(args.mem & ~1, len(cpu.memory)))
+    unit = "instructions" if cpu.mode == "functional" else "cycles"
+    print(f"Ran {cycles} {unit} in {elapsed:.3f} s ({cycles / elapsed if elapsed else 0:,.0f} {unit}/s)")
+    if hit is not None:
+        print(f"Stopped: {hit}")
+    elif not cpu.is_finished():
+        print("Stopped before the program finished.")
+    if args.profile:
+        print()
+        print(cpu.profiler.report(cpu))
+    if args.profile_out:
+        cpu.profiler.save(cpu, args.profile_out)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
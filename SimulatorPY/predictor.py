@@ -0,0 +1,89 @@
+from array import array
+
+from engine import BRANCHES, Op
+
+DIRECTIONS = ("not-taken", "btfn", "1bit", "2bit")
+
+
+class BranchPredictor:
+    """IF aşamasında sonraki fetch adresini tahmin eden dallanma birimi.
+
+    cpu.predictor = BranchPredictor("2bit") ile açılır. direction beq/bne
+    için yön tahminidir: "not-taken" (statik, her şey düz devam eder),
+    "btfn" (geriye dallanma alınır, ileriye alınmaz), "1bit"/"2bit"
+    (adresle indekslenen table_size girişli sayaç tablosu). j/jal hedefi
+    komutta yazılı olduğundan "not-taken" dışında hep alınmış sayılır.
+    jr hedefleri btb_size girişli doğrudan eşlemeli BTB'den tahmin edilir
+    (0: BTB yok). resolve_in_ex True ise kontrol komutları WB yerine EX'te
+    çözülür ve yanlış tahmin sadece IF/ID'yi boşaltır.
+    """
+
+    def __init__(self, direction="2bit", table_size=64, btb_size=16, resolve_in_ex=False):
+        if direction not in DIRECTIONS:
+            raise ValueError(f"direction must be one of {DIRECTIONS}")
+        if table_size < 1 or table_size & (table_size - 1):
+            raise ValueError("table_size must be a power of two")
+        if btb_size < 0:
+            raise ValueError("btb_size must be >= 0")
+        self.direction = direction
+        self.table_size = table_size
+        self.btb_size = btb_size
+        self.resolve_in_ex = resolve_in_ex
+        self.reset()
+
+    def reset(self):
+        # 2-bit sayaç: 0-1 alınmaz, 2-3 alınır; başlangıç "zayıf alınmaz"
+        self.counters = bytearray([1 if self.direction == "2bit" else 0]) * self.table_size
+        self.btb_tags = array("h", [-1] * self.btb_size)
+        self.btb_targets = array("h", [0] * self.btb_size)
+
+    def predict(self, instr):
+        """Kontrol komutu fetch edilirken sonraki fetch adresini döndürür."""
+        op = instr.op
+        addr = instr.addr
+        if op == Op.JR:
+            if self.btb_size:
+                i = addr % self.btb_size
+                if self.btb_tags[i] == addr:
+                    return self.btb_targets[i]
+            return addr + 1
+        target = instr.target
+        if target is None or self.direction == "not-taken":
+            return addr + 1
+        if op == Op.J or op == Op.JAL:
+            return target
+        if self.direction == "btfn":
+            return target if target <= addr else addr + 1
+        counter = self.counters[addr & (self.table_size - 1)]
+        taken = counter >= 2 if self.direction == "2bit" else counter == 1
+        return target if taken else addr + 1
+
+    def update(self, instr, next_pc):
+        """Çözülen komutun gerçek sonraki adresiyle tabloları günceller."""
+        op = instr.op
+        if op == Op.JR:
+            if self.btb_size:
+                i = instr.addr % self.btb_size
+                self.btb_tags[i] = instr.addr
+                self.btb_targets[i] = next_pc
+        elif op in BRANCHES and self.direction in ("1bit", "2bit"):
+            i = instr.addr & (self.table_size - 1)
+            taken = next_pc == instr.target
+            if self.direction == "1bit":
+                self.counters[i] = taken
+            elif taken:
+                self.counters[i] = min(self.counters[i] + 1, 3)
+            else:
+                self.counters[i] = max(self.counters[i] - 1, 0)
+
+    # --- CPU.save_state/load_state için ---
+    def get_state(self):
+        return bytes(self.counters) + self.btb_tags.tobytes() + self.btb_targets.tobytes()
+
+    def set_state(self, data):
+        n, m = self.table_size, 2 * self.btb_size
+        if len(data) != n + 2 * m:
+            raise ValueError("predictor state does not match this predictor configuration")
+        self.counters[:] = data[:n]
+        self.btb_tags = array("h", data[n:n + m])
+        self.btb_targets = array("h", data[n + m:])
@@ -0,0 +1,112 @@
+import bisect
+import csv
+import json
+
+from engine import FLUSH, IMEM_SIZE, Op
+
+FIELDS = ("addr", "label", "instruction", "executed", "stall_cycles", "flush_cycles", "mem_accesses", "cycles")
+
+
+class Profiler:
+    """Komut adresi ve label bölgesi başına sıcak nokta sayaçları.
+
+    cpu.profiler = Profiler() ile açılır. Her adres için yürütme sayısı,
+    detect_hazards'ın ona yüklediği stall cycle'ları, alınan j/jal/jr/beq/bne
+    komutlarının sebep olduğu flush cycle'ları ve bellek erişimleri sayılır.
+    Profiler atanmamışsa CPU.step'te sadece bir None kontrolü kalır.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.executed = [0] * IMEM_SIZE
+        self.stall_cycles = [0] * IMEM_SIZE
+        self.flush_cycles = [0] * IMEM_SIZE
+        self.mem_accesses = [0] * IMEM_SIZE
+        self.flush_owner = None  # son pipeline'ı boşaltan komutun adresi
+
+    # --- CPU.step tarafından çağrılanlar ---
+    def on_cycle(self, wb, retired):
+        # WB'de iş yapılmayan cycle'lar (flush baloncukları) flush'a sebep olan komuta yazılır
+        if (retired or wb is FLUSH) and self.flush_owner is not None:
+            self.flush_cycles[self.flush_owner] += 1
+
+    def on_execute(self, instr):
+        self.executed[instr.addr] += 1
+        if instr.op == Op.LW or instr.op == Op.SW:
+            self.mem_accesses[instr.addr] += 1
+
+    def on_stall(self, waiting):
+        self.stall_cycles[waiting.addr] += 1
+
+    # --- Raporlama ---
+    def rows(self, cpu):
+        """Çalışmış her adres için bir satır (dict), harcanan cycle'a göre azalan sırada."""
+        labels = sorted((addr, name) for name, addr in cpu.labels.items())
+        starts = [addr for addr, _ in labels]
+        out = []
+        for addr in range(IMEM_SIZE):
+            executed = self.executed[addr]
+            stalls = self.stall_cycles[addr]
+            flushes = self.flush_cycles[addr]
+            if not (executed or stalls or flushes):
+                continue
+            i = bisect.bisect_right(starts, addr) - 1
+            if i >= 0:
+                start, name = labels[i]
+                label = name if addr == start else f"{name}+{addr - start}"
+            else:
+                label = ""
+            instr = cpu.instruction_memory[addr]
+            out.append({
+                "addr": addr,
+                "label": label,
+                "instruction": instr.text if instr is not None else "",
+                "executed": executed,
+                "stall_cycles": stalls,
+                "flush_cycles": flushes,
+                "mem_accesses": self.mem_accesses[addr],
+                "cycles": executed + stalls + flushes,
+            })
+        out.sort(key=lambda row: row["cycles"], reverse=True)
+        return out
+
+    def regions(self, cpu):
+        """Label bölgelerine göre toplanmış sayaçlar (label'sız başlangıç "<start>")."""
+        totals = {}
+        for row in self.rows(cpu):
+            name = row["label"].split("+")[0] or "<start>"
+            region = totals.setdefault(name, {"region": name, "executed": 0, "stall_cycles": 0,
+                                              "flush_cycles": 0, "mem_accesses": 0, "cycles": 0})
+            for key in ("executed", "stall_cycles", "flush_cycles", "mem_accesses", "cycles"):
+                region[key] += row[key]
+        return sorted(totals.values(), key=lambda r: r["cycles"], reverse=True)
+
+    def report(self, cpu, top=20):
+        rows = self.rows(cpu)
+        total = sum(row["cycles"] for row in rows) or 1
+        lines = [f"{'Addr':>5}  {'Label':<14} {'Instruction':<22} {'Exec':>8} {'Stall':>7} {'Flush':>7} {'Mem':>7} {'%':>6}"]
+        for row in rows[:top]:
+            lines.append(f"{row['addr']:>5}  {row['label']:<14} {row['instruction']:<22} {row['executed']:>8} "
+                         f"{row['stall_cycles']:>7} {row['flush_cycles']:>7} {row['mem_accesses']:>7} "
+                         f"{100 * row['cycles'] / total:>5.1f}%")
+        lines.append("")
+        lines.append(f"{'Region':<14} {'Exec':>8} {'Stall':>7} {'Flush':>7} {'Mem':>7} {'%':>6}")
+        for region in self.regions(cpu):
+            lines.append(f"{region['region']:<14} {region['executed']:>8} {region['stall_cycles']:>7} "
+                         f"{region['flush_cycles']:>7} {region['mem_accesses']:>7} "
+                         f"{100 * region['cycles'] / total:>5.1f}%")
+        return "\n".join(lines)
+
+    def save(self, cpu, path):
+        """Düz profili .json ya da .csv olarak yazar (uzantıya göre)."""
+        rows = self.rows(cpu)
+        if str(path).endswith(".csv"):
+            with open(path, "w", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=FIELDS)
+                writer.writeheader()
+                writer.writerows(rows)
+        else:
+            with open(path, "w") as f:
+                json.dump({"instructions": rows, "regions": self.regions(cpu)}, f, indent=2)
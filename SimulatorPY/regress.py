@@ -0,0 +1,137 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from engine import CPU, DEFAULT_MEMORY_SIZE
+
+DEFAULT_MAX_CYCLES = 1_000_000
+
+# Her worker süreci kendi CPU nesnesini tekrar tekrar kullanır
+_cpu = None
+
+
+def _worker_init():
+    global _cpu
+    _cpu = CPU()
+    _cpu.verbose = False
+
+
+def load_expectation(asm_path):
+    """prog.asm için prog.json beklenti dosyasını okur (yoksa None).
+
+    Biçim: {"registers": {"R1": 5}, "memory": {"0": 9}, "max_cycles": 1000,
+    "memory_size": 1024}. memory anahtarları byte adresi, değerleri 16-bit
+    word'dür.
+    """
+    json_path = Path(asm_path).with_suffix(".json")
+    if not json_path.exists():
+        return None
+    with open(json_path) as f:
+        return json.load(f)
+
+
+def check_state(cpu, expect):
+    mismatches = []
+    for name, want in expect.get("registers", {}).items():
+        got = cpu.registers[name]
+        if got & 0xFFFF != want & 0xFFFF:
+            mismatches.append(f"{name}: expected {want}, got {got}")
+    for addr, want in expect.get("memory", {}).items():
+        addr = int(addr, 0) if isinstance(addr, str) else addr
+        got = cpu.read_word(addr)
+        if got & 0xFFFF != want & 0xFFFF:
+            mismatches.append(f"mem[{addr}]: expected {want}, got {got}")
+    return mismatches
+
+
+def run_one(asm_path, max_cycles=DEFAULT_MAX_CYCLES):
+    """Tek bir programı çalıştırır ve JSON'a yazılabilir sonuç kaydı döndürür."""
+    global _cpu
+    if _cpu is None:
+        _worker_init()
+    record = {"program": str(asm_path)}
+    start = time.perf_counter()
+    try:
+        expect = load_expectation(asm_path)
+        if expect is None:
+            raise FileNotFoundError("missing expectation file")
+        memory_size = expect.get("memory_size", DEFAULT_MEMORY_SIZE)
+        if len(_cpu.memory) != memory_size:
+            _cpu = CPU(memory_size=memory_size)
+            _cpu.verbose = False
+        else:
+            _cpu.memory[:] = bytes(memory_size)
+        with open(asm_path) as f:
+            _cpu.load_program(f.read())
+
+        limit = expect.get("max_cycles", max_cycles)
+        _cpu.run(max_cycles=limit)
+        metrics = _cpu.get_performance_metrics()
+        mismatches = check_state(_cpu, expect)
+        if not _cpu.is_finished():
+            mismatches.insert(0, f"did not finish within {limit} cycles")
+        record.update({
+            "status": "fail" if mismatches else "pass",
+            "cycles": metrics["Total Cycles"],
+            "instructions": metrics["Executed Instructions"],
+            "stalls": metrics["Stall Count"],
+            "cpi": metrics["CPI"],
+        })
+        if mismatches:
+            record["mismatches"] = mismatches
+    except Exception as e:
+        record.update({"status": "error", "error": f"{type(e).__name__}: {e}"})
+    record["wall_time"] = round(time.perf_counter() - start, 6)
+    return record
+
+
+def find_programs(directory, recursive=False):
+    pattern = "**/*.asm" if recursive else "*.asm"
+    return sorted(Path(directory).glob(pattern))
+
+
+def run_suite(programs, jobs=None, max_cycles=DEFAULT_MAX_CYCLES, chunksize=8):
+    """Programları süreç havuzunda çalıştırır; sonuçları geldikçe (sırayla) üretir."""
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_worker_init) as pool:
+        yield from pool.map(run_one, programs, [max_cycles] * len(programs), chunksize=chunksize)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a directory of RISC-16 programs against expected state")
+    parser.add_argument("directory", help="directory with prog.asm + prog.json pairs")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("-o", "--output", default=None, help="write JSONL results here (default: stdout)")
+    parser.add_argument("-r", "--recursive", action="store_true", help="search subdirectories too")
+    parser.add_argument("--max-cycles", type=int, default=DEFAULT_MAX_CYCLES,
+                        help="cycle limit for programs whose .json has no max_cycles")
+    args = parser.parse_args(argv)
+
+    programs = find_programs(args.directory, args.recursive)
+    if not programs:
+        print(f"No .asm files found in {args.directory}", file=sys.stderr)
+        return 1
+
+    out = open(args.output, "w") if args.output else sys.stdout
+    counts = {"pass": 0, "fail": 0, "error": 0}
+    start = time.perf_counter()
+    try:
+        for record in run_suite(programs, args.jobs, args.max_cycles):
+            counts[record["status"]] += 1
+            out.write(json.dumps(record) + "\n")
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"{len(programs)} programs in {elapsed:.2f} s: "
+          f"{counts['pass']} passed, {counts['fail']} failed, {counts['error']} errors", file=sys.stderr)
+    return 0 if counts["pass"] == len(programs) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
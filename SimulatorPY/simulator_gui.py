@@ -1,10 +1,139 @@
+import argparse
+import queue
+import time
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
-from engine import CPU  # engine.py içindeki CPU sınıfını çağırıyoruz
+from breakpoints import BreakpointSet
+from engine import CPU, DEFAULT_MEMORY_SIZE, Op, REG_NAMES, WORD
+from worker import SimWorker  # CPU'yu arka planda çalıştıran worker
+
+POLL_MS = 16           # snapshot kuyruğunu yoklama aralığı (~60 fps)
+WORDS_PER_ROW = 4      # bellek tablosunda satır başına 16-bit word
+ROW_BYTES = 2 * WORDS_PER_ROW
+VISIBLE_ROWS = 12      # Treeview'da gerçekten var olan satır sayısı
+RECENT_SECONDS = 1.5   # yeni yazılan word'lerin satırı bu kadar süre vurgulanır
+
+
+class MemoryPanel:
+    """Sadece görünen satırları çizen sanal bellek görünümü.
+
+    Bellek GUI tarafında bir bytearray aynasında tutulur; snapshot'taki tam
+    kopya ya da memory_diff (worker'ın take_changes yazma kaydı) ile
+    güncellenir. Treeview'da her zaman VISIBLE_ROWS satır vardır; kaydırma
+    sadece bu satırların değerlerini değiştirir, böylece bellek boyutu
+    çizim maliyetini etkilemez. Son yazılan word'lerin satırları kısa süre
+    vurgulanır.
+    """
+
+    def __init__(self, parent):
+        self.data = bytearray()
+        self.top = 0  # görünen ilk satır
+        self.recent = {}  # satır -> vurgunun biteceği zaman
+        self.shown = [None] * VISIBLE_ROWS  # Treeview'daki (değerler, tag'ler)
+
+        self.frame = tk.LabelFrame(parent, text="Memory (RAM)", bg="#d4d0c8", bd=2, relief="groove")
+        self.frame.pack(fill="both", expand=True, padx=5, pady=2)
+
+        controls = tk.Frame(self.frame, bg="#d4d0c8")
+        controls.pack(fill="x", padx=2, pady=2)
+        tk.Label(controls, text="Go to:", bg="#d4d0c8").pack(side="left")
+        self.goto_entry = tk.Entry(controls, font=("Courier New", 10), bg="white", fg="black", width=8)
+        self.goto_entry.pack(side="left", padx=2)
+        self.goto_entry.bind("<Return>", lambda e: self.goto())
+        self.hex_var = tk.BooleanVar(value=True)
+        tk.Checkbutton(controls, text="Hex", variable=self.hex_var, command=self.redraw, bg="#d4d0c8").pack(side="right")
+
+        columns = ("Addr",) + tuple(f"+{2 * i}" for i in range(WORDS_PER_ROW))
+        self.tree = ttk.Treeview(self.frame, columns=columns, show="headings", height=VISIBLE_ROWS,
+                                 selectmode="none")
+        for col in columns:
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=50 if col == "Addr" else 56, anchor="e")
+        self.tree.tag_configure("recent", background="#ffff99")
+        self.scrollbar = tk.Scrollbar(self.frame, orient="vertical", command=self.on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        self.tree.pack(side="left", fill="both", expand=True)
+        for i in range(VISIBLE_ROWS):
+            self.tree.insert("", "end", iid=str(i), values=())
+        for event in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.tree.bind(event, self.on_wheel)
+
+    def rows(self):
+        return max(1, -(-len(self.data) // ROW_BYTES))
+
+    def on_scrollbar(self, action, value, unit=None):
+        if action == "moveto":
+            self.scroll_to(int(float(value) * self.rows()))
+        else:
+            step = VISIBLE_ROWS if unit == "pages" else 1
+            self.scroll_to(self.top + int(value) * step)
+
+    def on_wheel(self, event):
+        if event.num == 4 or event.delta > 0:
+            self.scroll_to(self.top - 3)
+        else:
+            self.scroll_to(self.top + 3)
+        return "break"
+
+    def scroll_to(self, row):
+        row = max(0, min(row, self.rows() - VISIBLE_ROWS))
+        if row != self.top:
+            self.top = row
+            self.redraw()
+
+    def goto(self):
+        text = self.goto_entry.get().strip()
+        try:
+            addr = int(text, 0)
+        except ValueError:
+            messagebox.showwarning("Memory", f"Bad address: {text!r}")
+            return
+        if not 0 <= addr < len(self.data):
+            messagebox.showwarning("Memory", f"Address {addr} is outside memory (0-{len(self.data) - 1})")
+            return
+        self.scroll_to(addr // ROW_BYTES)
+
+    def apply(self, memory, memory_diff):
+        if memory is not None:
+            self.data = bytearray(memory)
+            self.recent.clear()
+            self.scroll_to(min(self.top, self.rows() - VISIBLE_ROWS))
+        else:
+            until = time.monotonic() + RECENT_SECONDS
+            data, recent = self.data, self.recent
+            for addr, word in memory_diff:
+                WORD.pack_into(data, addr, word)
+                recent[addr // ROW_BYTES] = until
+        self.redraw()
+
+    def redraw(self):
+        # Sadece değeri ya da vurgusu değişen görünür satırlar Treeview'a yazılır
+        now = time.monotonic()
+        if len(self.recent) > 4 * VISIBLE_ROWS:
+            self.recent = {row: t for row, t in self.recent.items() if t > now}
+        data = self.data
+        as_hex = self.hex_var.get()
+        for i in range(VISIBLE_ROWS):
+            row = self.top + i
+            base = row * ROW_BYTES
+            if base >= len(data):
+                item = ((), ())
+            else:
+                words = [WORD.unpack_from(data, addr)[0] for addr in range(base, min(base + ROW_BYTES, len(data)), 2)]
+                cells = [f"{w & 0xFFFF:04X}" if as_hex else str(w) for w in words]
+                tags = ("recent",) if self.recent.get(row, 0) > now else ()
+                item = ((f"{base:04X}" if as_hex else str(base), *cells), tags)
+            if self.shown[i] != item:
+                self.shown[i] = item
+                self.tree.item(str(i), values=item[0], tags=item[1])
+        rows = self.rows()
+        self.scrollbar.set(self.top / rows, min(1.0, (self.top + VISIBLE_ROWS) / rows))
+
 
 class RISC16GUI:
-    def __init__(self, root):
-        self.cpu = CPU()
+    def __init__(self, root, memory_size=DEFAULT_MEMORY_SIZE):
+        # CPU'nun sahibi worker thread'idir; GUI sadece snapshot'ları çizer
+        self.worker = SimWorker(CPU(memory_size=memory_size))
         self.root = root
         self.root.title("RISC-16 Pipeline Simulator")
         self.root.geometry("1000x750")
@@ -21,6 +150,12 @@ class RISC16GUI:
         # Otomatik ilerleme değişkenleri
         self.is_running = False
         self.run_speed = 500
+        self.shown_pipeline = {}
+        self.shown_registers = (None,) * 8
+
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.worker.start()
+        self.root.after(POLL_MS, self.poll_snapshots)
 
     def setup_ui(self):
         # Genel arka plan rengini ayarla
@@ -83,18 +218,24 @@ class RISC16GUI:
             label.pack(side="right")
             self.reg_labels[r_name] = label
 
-        # Memory (Treeview stili)
-        self.mem_frame = tk.LabelFrame(right_panel, text="Memory (RAM)", bg="#d4d0c8", bd=2, relief="groove")
-        self.mem_frame.pack(fill="both", expand=True, padx=5, pady=2)
-        
+        # Breakpoints: "loop", "12 if R3 > 100", "if R1 == 0", "watch R3", "watch 0x20 change"
+        bp_frame = tk.LabelFrame(right_panel, text="Breakpoints", bg="#d4d0c8", bd=2, relief="groove")
+        bp_frame.pack(fill="x", padx=5, pady=2)
+        self.bp_entry = tk.Entry(bp_frame, font=("Courier New", 10), bg="white", fg="black", width=18)
+        self.bp_entry.pack(fill="x", padx=5, pady=2)
+        self.bp_entry.bind("<Return>", lambda e: self.add_breakpoint())
+        bp_buttons = tk.Frame(bp_frame, bg="#d4d0c8")
+        bp_buttons.pack(fill="x", padx=5)
+        small_btn = {"font": ("MS Sans Serif", 8), "bg": "#d4d0c8", "relief": "raised", "bd": 2}
+        tk.Button(bp_buttons, text="Add", command=self.add_breakpoint, **small_btn).pack(side="left", expand=True, fill="x")
+        tk.Button(bp_buttons, text="Remove", command=self.remove_breakpoint, **small_btn).pack(side="left", expand=True, fill="x")
+        self.bp_list = tk.Listbox(bp_frame, font=("Courier New", 9), bg="white", fg="black", height=4)
+        self.bp_list.pack(fill="x", padx=5, pady=2)
+
+        # Memory (Treeview stili, sadece görünen satırlar)
         style = ttk.Style()
         style.theme_use("clam") # Klasik görünüme en yakın tema
-        self.mem_tree = ttk.Treeview(self.mem_frame, columns=("Addr", "Value"), show="headings", height=8)
-        self.mem_tree.heading("Addr", text="Addr")
-        self.mem_tree.heading("Value", text="Data")
-        self.mem_tree.column("Addr", width=50)
-        self.mem_tree.column("Value", width=100)
-        self.mem_tree.pack(side="left", fill="both", expand=True)
+        self.memory_panel = MemoryPanel(right_panel)
 
         # --- 3. ALT BÖLÜM ---
         bottom_frame = tk.Frame(self.root, bg="#d4d0c8", bd=2, relief="raised", pady=5)
@@ -104,6 +245,7 @@ class RISC16GUI:
         btn_style = {"font": ("MS Sans Serif", 8), "bg": "#d4d0c8", "relief": "raised", "bd": 2}
         
         tk.Button(bottom_frame, text="Load Program", command=self.load_code, **btn_style).pack(side="left", padx=5)
+        tk.Button(bottom_frame, text="Step Back", command=self.step_back, **btn_style).pack(side="left", padx=5)
         tk.Button(bottom_frame, text="Step Cycle", command=self.step_cycle, **btn_style).pack(side="left", padx=5)
         
         self.run_btn = tk.Button(bottom_frame, text="Run", command=self.toggle_run, **btn_style, width=8)
@@ -117,6 +259,9 @@ class RISC16GUI:
         self.speed_scale.set(500)
         self.speed_scale.pack(side="left", padx=5)
 
+        self.turbo_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(bottom_frame, text="Turbo", variable=self.turbo_var, command=self.update_run_delay, bg="#d4d0c8").pack(side="left", padx=5)
+
         tk.Button(bottom_frame, text="Reset", command=self.reset_simulator, **btn_style).pack(side="left", padx=5)
 
         self.perf_label = tk.Label(bottom_frame, text="CPI: 0.0 | IPC: 0.0", bg="#d4d0c8", font=("MS Sans Serif", 8, "bold"))
@@ -130,27 +275,40 @@ class RISC16GUI:
     # --- YENİ FONKSİYONLAR ---
     def update_speed(self, val):
         self.run_speed = int(val)
+        self.update_run_delay()
+
+    def run_delay(self):
+        # Turbo: worker tam hızda koşar, ekran yine de ~60 fps çizilir
+        return 0.0 if self.turbo_var.get() else self.run_speed / 1000
+
+    def update_run_delay(self):
+        if self.is_running:
+            self.worker.run_sim(self.run_delay())
 
     def toggle_run(self):
         if not self.is_running:
             self.is_running = True
             self.run_btn.config(state="disabled")
-            self.auto_step()
+            self.worker.run_sim(self.run_delay())
 
     def pause_run(self):
         self.is_running = False
         self.run_btn.config(state="normal")
-
-    def auto_step(self):
-        if self.is_running:
-            if not self.cpu.is_finished():
-                self.cpu.step()
-                self.update_ui()
-                self.root.after(self.run_speed, self.auto_step)
-            else:
-                self.is_running = False
-                self.run_btn.config(state="normal")
-                messagebox.showinfo("Done", "Program execution finished.")
+        self.worker.pause()
+
+    def poll_snapshots(self):
+        # Worker'ın yayınladığı tüm snapshot'ları sırayla uygula
+        try:
+            while True:
+                self.apply_snapshot(self.worker.snapshots.get_nowait())
+        except queue.Empty:
+            pass
+        self.memory_panel.redraw()  # süresi dolan vurgular sönsün
+        self.root.after(POLL_MS, self.poll_snapshots)
+
+    def on_close(self):
+        self.worker.stop()
+        self.root.destroy()
 
     # --- MEVCUT FONKSİYONLAR ---
     def load_code(self):
@@ -158,35 +316,49 @@ class RISC16GUI:
         if not raw_code.strip():
             messagebox.showwarning("Warning", "Please enter some code!")
             return
-        self.cpu.load_program(raw_code)
-        self.update_ui()
-        messagebox.showinfo("Success", "Program loaded into Instruction Memory.")
+        self.pause_run()
+        self.worker.load(raw_code)
 
     def step_cycle(self):
-        if self.cpu.is_finished():
-            messagebox.showinfo("Done", "Program execution finished.")
+        self.worker.step()
+
+    def step_back(self):
+        # En yakın checkpoint'ten tekrar koşarak bir cycle geri gider
+        self.pause_run()
+        self.worker.step_back()
+
+    def add_breakpoint(self):
+        spec = self.bp_entry.get().strip()
+        if not spec:
             return
-        self.cpu.step()
-        self.update_ui()
+        try:
+            BreakpointSet().add(spec)  # sözdizimi burada, label'lar koşuda kontrol edilir
+        except ValueError as e:
+            messagebox.showwarning("Breakpoint", str(e))
+            return
+        self.bp_list.insert(tk.END, spec)
+        self.bp_entry.delete(0, tk.END)
+        self.worker.set_breakpoints(self.bp_list.get(0, tk.END))
+
+    def remove_breakpoint(self):
+        for index in reversed(self.bp_list.curselection()):
+            self.bp_list.delete(index)
+        self.worker.set_breakpoints(self.bp_list.get(0, tk.END))
 
     def reset_simulator(self):
-        self.is_running = False
-        self.run_btn.config(state="normal")
-        self.cpu.reset()
-        self.update_ui()
+        self.pause_run()
+        self.worker.reset()
 
-    def update_ui(self):
+    def apply_snapshot(self, snap):
+        # Sadece önceki snapshot'a göre değişen widget'lar güncellenir
         # 1. Pipeline Güncelle
-        for stage, content in self.cpu.pipeline.items():
+        for stage, display_text, op in snap.pipeline:
+            if self.shown_pipeline.get(stage) == (display_text, op):
+                continue
+            self.shown_pipeline[stage] = (display_text, op)
             label, frame = self.pipeline_vars[stage]
-            if isinstance(content, dict):
-                display_text = content["text"]
-                is_stall = "Stall" in display_text or "STALL" in display_text
-                is_flush = "Flush" in display_text or "NOP" in display_text
-            else:
-                display_text = str(content)
-                is_stall = "Stall" in display_text or "STALL" in display_text
-                is_flush = "Flush" in display_text or "NOP" in display_text
+            is_stall = op == Op.STALL
+            is_flush = op == Op.NOP
 
             label.config(text=display_text)
             
@@ -204,22 +376,43 @@ class RISC16GUI:
                 label.config(fg="black" , bg="white")
 
         # 2. Register Güncelle
-        for r_name, label in self.reg_labels.items():
-            label.config(text=str(self.cpu.registers[r_name]))
+        for i, val in enumerate(snap.registers):
+            if self.shown_registers[i] != val:
+                self.reg_labels[REG_NAMES[i]].config(text=str(val))
+        self.shown_registers = snap.registers
 
         # 3. Performans Güncelle
-        metrics = self.cpu.get_performance_metrics()
+        metrics = snap.metrics
         self.perf_label.config(text=f"CPI: {metrics['CPI']} | IPC: {metrics['IPC']} | Cycles: {metrics['Total Cycles']} | Stalls: {metrics['Stall Count']}")
 
-        # 4. Bellek Tablosu Güncelle
-        for i in self.mem_tree.get_children():
-            self.mem_tree.delete(i)
-        mem_data = self.cpu.get_memory_dump(limit=32)
-        for addr, val in mem_data.items():
-            hex_val = f"0x{val:04X}"
-            self.mem_tree.insert("", "end", values=(f"{addr:03d}", f"{hex_val} ({val})"))
+        # 4. Bellek Tablosu Güncelle (sadece görünen satırlar)
+        self.memory_panel.apply(snap.memory, snap.memory_diff)
+
+        # 5. Worker mesajları
+        if self.is_running and snap.finished and not snap.running:
+            self.is_running = False
+            self.run_btn.config(state="normal")
+        if snap.message is not None:
+            kind, text = snap.message
+            if kind in ("warning", "break") and self.is_running and not snap.running:
+                self.is_running = False
+                self.run_btn.config(state="normal")
+            if kind == "error":
+                messagebox.showerror("Syntax Error", text)
+            elif kind == "warning":
+                messagebox.showwarning("Warning", text)
+            elif kind == "break":
+                messagebox.showinfo("Breakpoint", text)
+            elif kind == "loaded":
+                messagebox.showinfo("Success", text)
+            else:
+                messagebox.showinfo("Done", text)
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="RISC-16 pipeline simulator")
+    parser.add_argument("--memory-size", type=int, default=DEFAULT_MEMORY_SIZE,
+                        help="data memory size in bytes (power of two)")
+    args = parser.parse_args()
     root = tk.Tk()
-    app = RISC16GUI(root)
+    app = RISC16GUI(root, args.memory_size)
     root.mainloop()
\ No newline at end of file
@@ -0,0 +1,28 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# Modüller SimulatorPY/ içinden düz import edilir (main.py'deki gibi)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+KERNEL_DIR = Path(__file__).resolve().parent.parent / "benchmarks"
+
+
+@pytest.fixture
+def kernel():
+    """benchmarks/ altındaki bir kernel'in kaynağını adıyla döndürür."""
+    return lambda name: (KERNEL_DIR / f"{name}.asm").read_text()
+
+
+@pytest.fixture
+def make_cpu():
+    from engine import CPU
+
+    def make(source=None, **kwargs):
+        cpu = CPU(**kwargs)
+        cpu.verbose = False
+        if source is not None:
+            cpu.load_program(source)
+        return cpu
+    return make
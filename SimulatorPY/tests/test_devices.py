@@ -0,0 +1,93 @@
+import io
+
+import pytest
+
+import main
+from devices import ConsoleDevice, CycleCounterDevice
+from engine import BusError
+from translator import BlockTranslator
+
+ENGINES = ["pipeline", "functional", "translated"]
+
+
+def _make(make_cpu, source, engine, **kwargs):
+    cpu = make_cpu(memory_size=1024, address_space=4096, **kwargs)
+    cpu.load_program(source)
+    if engine != "pipeline":
+        cpu.set_mode("functional")
+    if engine == "translated":
+        cpu.translator = BlockTranslator()
+    return cpu
+
+
+def _executed(cpu):
+    return cpu.executed_instr_count + cpu.functional_instr_count
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("rd", ["R0", "R4"])
+def test_unmapped_load_stops_every_engine(make_cpu, engine, rd):
+    source = f"""
+        addi R1, R0, 10
+        addi R2, R0, 2000
+        lw {rd}, 0(R2)
+        addi R3, R0, 5
+        halt
+    """
+    cpu = _make(make_cpu, source, engine)
+    cpu.track_changes = True
+    for _ in range(2):  # tekrar denemek aynı hatayı verir, sayaçlar değişmez
+        with pytest.raises(BusError, match="unmapped address 0x07D0"):
+            cpu.run()
+        assert list(cpu.regs) == [0, 10, 2000, 0, 0, 0, 0, 0]
+        assert _executed(cpu) == 2
+        assert 4 not in cpu.dirty_regs
+    if engine != "pipeline":
+        assert cpu.pc == 2
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_unmapped_store_stops_every_engine(make_cpu, engine):
+    source = """
+        addi R1, R0, 7
+        sw R1, 0(R0)
+        addi R2, R0, -8
+        sw R1, 0(R2)
+        addi R3, R0, 5
+        halt
+    """
+    cpu = _make(make_cpu, source, engine)
+    with pytest.raises(BusError, match="unmapped address 0x0FF8"):
+        cpu.run()
+    assert cpu.read_word(0) == 7
+    assert cpu.registers["R3"] == 0
+    assert _executed(cpu) == 3
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_devices_behave_the_same_in_every_engine(make_cpu, engine):
+    source = """
+        addi R1, R0, 2040      # 0x7F8: konsol
+        addi R2, R0, 72
+        sw R2, 0(R1)
+        addi R2, R0, 42
+        sw R2, 2(R1)
+        lw R0, 0(R1)           # yan etkisiz okuma
+        lw R3, 8(R1)           # sayaç (0x800)
+        halt
+    """
+    out = io.StringIO()
+    cpu = _make(make_cpu, source, engine)
+    cpu.map_device(0x7F8, ConsoleDevice(out))
+    cpu.map_device(0x800, CycleCounterDevice())
+    cpu.run()
+    assert out.getvalue() == "H42\n"
+    assert cpu.registers["R0"] == 0
+
+
+def test_main_reports_bus_error(tmp_path, capsys):
+    program = tmp_path / "bad.asm"
+    program.write_text("addi R2, R0, 2000\nlw R1, 0(R2)\nhalt\n")
+    for extra in ([], ["--functional"], ["--functional", "--translate"], ["--ff", "5"]):
+        assert main.main([str(program), "--address-space", "4096", *extra]) == 1
+        assert "unmapped address 0x07D0" in capsys.readouterr().err
@@ -0,0 +1,117 @@
+import random
+
+import pytest
+
+from cache import Cache
+from predictor import BranchPredictor
+from translator import BlockTranslator
+
+ENGINES = ["pipeline", "detailed", "functional", "translated"]
+REGS = [f"R{i}" for i in range(8)]
+
+SHIFTS = "addi R1, R0, -3\n" + "".join(
+    f"sll R2, R1, {k}\nsrl R3, R1, {k}\nsw R2, {2 * i}(R0)\nsw R3, {2 * i + 32}(R0)\n"
+    for i, k in enumerate((0, 1, 15, 16, 17, 31, 32, 33, 63, 100))) + "halt"
+
+
+def random_program(seed, length=60):
+    """Sadece ileri dallanan (her zaman biten) rastgele bir program üretir.
+
+    Açık nop yoktur: fonksiyonel motorlar onu yürütülen komut sayar, pipeline saymaz.
+    """
+    rng = random.Random(seed)
+    reg = lambda: rng.choice(REGS)
+    lines = []
+    for i in range(length):
+        kind = rng.randrange(10)
+        if kind < 3:
+            op = rng.choice(["add", "sub", "and", "or", "slt"])
+            text = f"{op} {reg()}, {reg()}, {reg()}"
+        elif kind < 5:
+            text = f"addi {reg()}, {reg()}, {rng.randint(-32, 31)}"
+        elif kind == 5:
+            text = f"{rng.choice(['sll', 'srl'])} {reg()}, {reg()}, {rng.randint(0, 63)}"
+        elif kind == 6:
+            text = f"lw {reg()}, {rng.randint(-32, 31)}({reg()})"
+        elif kind == 7:
+            text = f"sw {reg()}, {rng.randint(-32, 31)}({reg()})"
+        elif kind == 8:
+            text = f"{rng.choice(['beq', 'bne'])} {reg()}, {reg()}, L{rng.randint(i + 1, length)}"
+        else:
+            text = rng.choice([f"j L{rng.randint(i + 1, length)}",
+                               f"jal {reg()}, L{rng.randint(i + 1, length)}"])
+        lines.append(f"L{i}: {text}")
+    lines.append(f"L{length}: halt")
+    return "\n".join(lines)
+
+
+def _run(make_cpu, source, engine):
+    cpu = make_cpu()
+    if engine == "detailed":
+        cpu.set_forwarding("full")
+        cpu.predictor = BranchPredictor("2bit", resolve_in_ex=True)
+        cpu.icache = Cache(size=64, line_size=8)
+        cpu.dcache = Cache(size=128, assoc=2, line_size=8, write_back=False)
+    cpu.load_program(source)
+    if engine in ("functional", "translated"):
+        cpu.set_mode("functional")
+    if engine == "translated":
+        cpu.translator = BlockTranslator()
+    cpu.run(max_cycles=1_000_000)
+    assert cpu.is_finished()
+    return cpu
+
+
+def _result(cpu):
+    return list(cpu.regs), bytes(cpu.memory), cpu.executed_instr_count + cpu.functional_instr_count
+
+
+def _sources():
+    from conftest import KERNEL_DIR
+    named = [(path.stem, path.read_text()) for path in sorted(KERNEL_DIR.glob("*.asm"))]
+    named.append(("shifts", SHIFTS))
+    named += [(f"random{seed}", random_program(seed)) for seed in range(25)]
+    return named
+
+
+SOURCES = _sources()
+
+
+@pytest.mark.parametrize("name, source", SOURCES, ids=[name for name, _ in SOURCES])
+def test_engines_agree(make_cpu, name, source):
+    ref = _run(make_cpu, source, "pipeline")
+    for engine in ENGINES[1:]:
+        assert _result(_run(make_cpu, source, engine)) == _result(ref), engine
+
+
+# Kernel'lar on binlerce cycle sürer; batch (cycle başına NumPy) için kısa programlar yeter
+SHORT_SOURCES = [(name, source) for name, source in SOURCES if name == "shifts" or name.startswith("random")]
+
+
+@pytest.mark.parametrize("name, source", SHORT_SOURCES, ids=[name for name, _ in SHORT_SOURCES])
+def test_batch_matches_pipeline(make_cpu, name, source):
+    pytest.importorskip("numpy")
+    from batch import BatchCPU
+
+    ref = _run(make_cpu, source, "pipeline")
+    batch = BatchCPU(3)
+    batch.load_program(source)
+    batch.run()
+    for lane in range(batch.n):
+        assert batch.regs[lane].tolist() == list(ref.regs)
+        assert batch.memory[lane].tobytes() == bytes(ref.memory)
+        assert int(batch.executed_instr_count[lane]) == ref.executed_instr_count
+        assert int(batch.total_cycles[lane]) == ref.total_cycles
+
+
+def test_fast_forward_then_pipeline_matches(make_cpu, kernel):
+    source = kernel("sort")
+    ref = _run(make_cpu, source, "pipeline")
+    for translated in (False, True):
+        cpu = make_cpu(source)
+        if translated:
+            cpu.translator = BlockTranslator()
+        cpu.fast_forward(1000)
+        cpu.run()
+        assert (list(cpu.regs), bytes(cpu.memory)) == (list(ref.regs), bytes(ref.memory))
+        assert cpu.executed_instr_count + cpu.functional_instr_count == ref.executed_instr_count
@@ -0,0 +1,30 @@
+import pytest
+
+import main
+
+
+@pytest.fixture
+def program(tmp_path, kernel):
+    path = tmp_path / "calls.asm"
+    path.write_text(kernel("calls"))
+    return str(path)
+
+
+def _registers(output):
+    return [line for line in output.splitlines() if line.startswith("  R")]
+
+
+@pytest.mark.parametrize("value", ["nosuch", "0xZZ", ""])
+def test_ff_to_unknown_label_is_a_usage_error(program, capsys, value):
+    with pytest.raises(SystemExit) as exc:
+        main.main([program, "--ff-to", value])
+    assert exc.value.code == 2
+    assert f"unknown label or address {value!r}" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("value", ["rec", "12", "0xC"])
+def test_ff_to_label_or_address_finishes_like_a_plain_run(program, capsys, value):
+    assert main.main([program]) == 0
+    plain = _registers(capsys.readouterr().out)
+    assert main.main([program, "--ff-to", value]) == 0
+    assert _registers(capsys.readouterr().out) == plain
@@ -0,0 +1,106 @@
+import pytest
+
+from cache import Cache
+from checkpoint import CheckpointRing
+from engine import STATE_HEADER
+from predictor import BranchPredictor
+
+import main
+
+
+def _state(cpu):
+    return cpu.save_state(), [str(instr) for instr in cpu.pipeline.values()]
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_round_trip_resumes_identically(make_cpu, kernel, compress):
+    source = kernel("sort")
+    ref = make_cpu(source)
+    ref.run(max_cycles=1234)
+    saved = ref.save_state(compress=compress)
+    ref.run()
+
+    cpu = make_cpu(source)
+    cpu.load_state(saved)
+    cpu.run()
+    assert _state(cpu) == _state(ref)
+
+
+def test_round_trip_with_large_predictor_and_caches(make_cpu, kernel):
+    # Uzunluk alanları 64 KiB'ı aşan blob'ları taşıyabilmeli
+    def configured():
+        cpu = make_cpu(kernel("memcopy"))
+        cpu.predictor = BranchPredictor("2bit", 131072, 16, resolve_in_ex=True)
+        cpu.icache = Cache(size=32768, line_size=8)
+        cpu.dcache = Cache(size=32768, assoc=2, line_size=8)
+        return cpu
+
+    ref = configured()
+    ref.run(max_cycles=500)
+    saved = ref.save_state(compress=True)
+    ref.run()
+
+    cpu = configured()
+    cpu.load_state(saved)
+    cpu.run()
+    assert _state(cpu) == _state(ref)
+
+
+def test_snapshot_of_another_program_is_rejected(make_cpu, kernel):
+    other = make_cpu(kernel("sort"))
+    other.run(max_cycles=300)
+    cpu = make_cpu(kernel("arith"))
+    before = _state(cpu)
+    with pytest.raises(ValueError, match="different program"):
+        cpu.load_state(other.save_state())
+    assert _state(cpu) == before
+
+
+def test_missing_stage_instruction_is_rejected(make_cpu, kernel):
+    cpu = make_cpu(kernel("arith"))
+    cpu.run(max_cycles=20)
+    data = cpu.save_state()
+    fields = list(STATE_HEADER.unpack_from(data))
+    fields[27] = 400  # IF: programda olmayan adres
+    forged = STATE_HEADER.pack(*fields) + data[STATE_HEADER.size:]
+    with pytest.raises(ValueError, match="missing instruction 400"):
+        cpu.load_state(forged)
+
+
+@pytest.mark.parametrize("damage", [
+    lambda data: b"XXXX" + data[4:],
+    lambda data: data[:-10],
+])
+def test_damaged_snapshot_is_rejected(make_cpu, kernel, damage):
+    cpu = make_cpu(kernel("arith"))
+    cpu.run(max_cycles=20)
+    with pytest.raises(ValueError):
+        cpu.load_state(damage(cpu.save_state()))
+
+
+def test_main_reports_foreign_snapshot(tmp_path, kernel, capsys):
+    sort_asm, arith_asm = tmp_path / "sort.asm", tmp_path / "arith.asm"
+    sort_asm.write_text(kernel("sort"))
+    arith_asm.write_text(kernel("arith"))
+    snapshot = tmp_path / "sort.state"
+    assert main.main([str(sort_asm), "--max-cycles", "300", "--save-state", str(snapshot)]) == 0
+    capsys.readouterr()
+    assert main.main([str(arith_asm), "--load-state", str(snapshot)]) == 1
+    assert "different program" in capsys.readouterr().err
+
+
+def test_checkpoints_replay_across_fast_forward(make_cpu, kernel):
+    source = kernel("calls")
+    cpu = make_cpu(source)
+    cpu.checkpoints = CheckpointRing(interval=50, capacity=16)
+    cpu.fast_forward(200)
+    start = cpu.total_cycles
+    cpu.run(max_cycles=400)
+    target = start + 123
+
+    ref = make_cpu(source)
+    ref.fast_forward(200)
+    ref.run(max_cycles=123)
+
+    cpu.checkpoints.run_to_cycle(cpu, target)
+    assert _state(cpu) == _state(ref)
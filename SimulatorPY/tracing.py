@@ -0,0 +1,340 @@
+import argparse
+import gzip
+import struct
+import sys
+from collections import namedtuple
+from itertools import zip_longest
+
+from engine import EMPTY, Op
+
+# İz dosyası: başlık, ardından her cycle için bir kayıt. Kayıt sadece
+# önceki cycle'a göre değişenleri taşır (delta kodlama):
+#   flags (u8): 1=pc, 2=aşamalar, 4=register yazımları, 8=bellek yazımları
+#   pc (>h) | aşama maskesi (u8) + değişen her aşama için kod (>h)
+#   | sayı (u8) + (reg u8, değer >h)... | sayı (u8) + (adres >H, değer >h)...
+# Aşama kodu: komut adresi, -1 Empty, -2 NOP/Flush, -3 Stall.
+TRACE_MAGIC = b"R16T\x01"
+STAGES = ("IF", "ID", "EX", "MEM", "WB")
+F_PC, F_STAGES, F_REGS, F_MEM = 1, 2, 4, 8
+
+_H = struct.Struct(">h")
+_REG = struct.Struct(">Bh")
+_MEM = struct.Struct(">Hh")
+
+Cycle = namedtuple("Cycle", "cycle pc stages reg_writes mem_writes")
+
+
+def _open(path, mode):
+    # .gz uzantılı dosyalar sıkıştırılmış yazılır/okunur
+    if str(path).endswith(".gz"):
+        return gzip.open(path, mode, compresslevel=6)
+    return open(path, mode)
+
+
+def stage_code(instr):
+    if instr.op == Op.STALL:
+        return -3
+    if instr is EMPTY:
+        return -1
+    return instr.addr if instr.addr >= 0 else -2
+
+
+class TraceWriter:
+    """Cycle başına pipeline, PC, register ve bellek yazımlarını diske akıtır.
+
+    cpu.tracer = TraceWriter("run.r16t.gz") ile açılır. Kayıtlar bellekte
+    küçük bir tamponda biriktirilip parça parça yazılır; bellek kullanımı
+    çalışma uzunluğundan bağımsızdır.
+    """
+
+    def __init__(self, path, buffer_size=1 << 16):
+        self.file = _open(path, "wb")
+        self.file.write(TRACE_MAGIC)
+        self.buffer = bytearray()
+        self.buffer_size = buffer_size
+        self.cycles = 0
+        self._pc = None
+        self._stages = [None] * 5
+        self._regs = []
+        self._mem = []
+
+    def reg_write(self, reg, val):
+        self._regs.append((reg, val))
+
+    def mem_write(self, addr, val):
+        self._mem.append((addr, val))
+
+    def on_cycle(self, cpu):
+        buf = self.buffer
+        flags_at = len(buf)
+        buf.append(0)
+        flags = 0
+
+        if cpu.pc != self._pc:
+            flags |= F_PC
+            self._pc = cpu.pc
+            buf += _H.pack(((cpu.pc + 0x8000) & 0xFFFF) - 0x8000)
+
+        mask = 0
+        codes = []
+        for i, stage in enumerate(STAGES):
+            code = stage_code(cpu.pipeline[stage])
+            if code != self._stages[i]:
+                self._stages[i] = code
+                mask |= 1 << i
+                codes.append(code)
+        if mask:
+            flags |= F_STAGES
+            buf.append(mask)
+            for code in codes:
+                buf += _H.pack(code)
+
+        if self._regs:
+            flags |= F_REGS
+            buf.append(len(self._regs))
+            for reg, val in self._regs:
+                buf += _REG.pack(reg, val)
+            self._regs.clear()
+
+        if self._mem:
+            flags |= F_MEM
+            buf.append(len(self._mem))
+            for addr, val in self._mem:
+                buf += _MEM.pack(addr, val)
+            self._mem.clear()
+
+        buf[flags_at] = flags
+        self.cycles += 1
+        if len(buf) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        self.file.write(self.buffer)
+        self.buffer.clear()
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_trace(path):
+    """İz dosyasını cycle cycle okur (Cycle kayıtları üretir)."""
+    with _open(path, "rb") as f:
+        if f.read(len(TRACE_MAGIC)) != TRACE_MAGIC:
+            raise ValueError(f"{path}: not a RISC-16 trace")
+        pc = 0
+        stages = [-1] * 5
+        cycle = 0
+        while True:
+            head = f.read(1)
+            if not head:
+                return
+            flags = head[0]
+            if flags & F_PC:
+                pc = _H.unpack(f.read(2))[0]
+            if flags & F_STAGES:
+                mask = f.read(1)[0]
+                for i in range(5):
+                    if mask & (1 << i):
+                        stages[i] = _H.unpack(f.read(2))[0]
+            reg_writes = ()
+            if flags & F_REGS:
+                n = f.read(1)[0]
+                reg_writes = tuple(_REG.unpack(f.read(3)) for _ in range(n))
+            mem_writes = ()
+            if flags & F_MEM:
+                n = f.read(1)[0]
+                mem_writes = tuple(_MEM.unpack(f.read(4)) for _ in range(n))
+            yield Cycle(cycle, pc, tuple(stages), reg_writes, mem_writes)
+            cycle += 1
+
+
+# --- VCD ---
+_UNKNOWN_BITS = str.maketrans("xXzZ", "0000")
+# Sinyal isimleri tb_risc16 ile aynıdır, böylece iki VCD aynı şekilde okunur.
+VCD_SIGNALS = (
+    ("clk", 1), ("pc", 16),
+    ("IF_stage", 16), ("ID_stage", 16), ("EX_stage", 16), ("MEM_stage", 16), ("WB_stage", 16),
+    ("MEM_WB_regWrite", 1), ("MEM_WB_rd", 3), ("MEM_WB_alu_out", 16),
+    ("mem_write", 1), ("mem_addr", 16), ("mem_data", 16),
+)
+
+
+def _vcd_value(width, val):
+    if width == 1:
+        return f"{val & 1}"
+    return f"b{val & ((1 << width) - 1):b} "
+
+
+def export_vcd(trace_path, vcd_path, period=10):
+    """İzi VCD'ye çevirir. Her cycle period zaman birimidir; clk yarıda yükselir."""
+    ids = {name: chr(37 + i) for i, (name, _) in enumerate(VCD_SIGNALS)}  # "#" zaman damgasıdır
+    widths = dict(VCD_SIGNALS)
+    with open(vcd_path, "w") as out:
+        out.write("$timescale 1ns $end\n$scope module tb_risc16 $end\n")
+        out.write(f"$var reg 1 {ids['clk']} clk $end\n$scope module uut $end\n")
+        for name, width in VCD_SIGNALS[1:]:
+            out.write(f"$var reg {width} {ids[name]} {name} $end\n")
+        out.write("$upscope $end\n$upscope $end\n$enddefinitions $end\n")
+
+        last = {}
+        for cyc in read_trace(trace_path):
+            reg = cyc.reg_writes[-1] if cyc.reg_writes else None
+            mem = cyc.mem_writes[-1] if cyc.mem_writes else None
+            values = {
+                "clk": 0, "pc": cyc.pc,
+                "MEM_WB_regWrite": 1 if reg else 0,
+                "MEM_WB_rd": reg[0] if reg else last.get("MEM_WB_rd", 0),
+                "MEM_WB_alu_out": reg[1] if reg else last.get("MEM_WB_alu_out", 0),
+                "mem_write": 1 if mem else 0,
+                "mem_addr": mem[0] if mem else last.get("mem_addr", 0),
+                "mem_data": mem[1] if mem else last.get("mem_data", 0),
+            }
+            for stage, code in zip(STAGES, cyc.stages):
+                values[f"{stage}_stage"] = code
+            changes = [f"{_vcd_value(widths[n], v)}{ids[n]}" for n, v in values.items() if last.get(n) != v]
+            out.write(f"#{cyc.cycle * period}\n")
+            if changes:
+                out.write("\n".join(changes) + "\n")
+            out.write(f"#{cyc.cycle * period + period // 2}\n1{ids['clk']}\n")
+            last.update(values)
+            last["clk"] = 1
+
+
+def _vcd_events(path):
+    """VCD'deki her yükselen clk kenarında register/bellek yazım olaylarını üretir.
+
+    Değerler kenardan hemen önceki hallerinden okunur (Verilog'daki gibi).
+    Olay: (cycle, "reg"|"mem", indeks/adres, 16-bit değer).
+    """
+    names = {}
+    scope = []
+    state = {}
+    pending = []
+    cycle = 0
+
+    def ident(suffix):
+        for code, name in names.items():
+            if name.split(".")[-1] == suffix:
+                return code
+        return None
+
+    def flush_timestamp():
+        nonlocal cycle
+        clk_rises = any(code == clk and val == 1 and state.get(clk) == 0 for code, val in pending)
+        events = []
+        if clk_rises and not state.get(rst, 0):
+            if state.get(we) == 1 and state.get(rd, 0) != 0:
+                events.append((cycle, "reg", state[rd], state.get(data, 0) & 0xFFFF))
+            if mw is not None and state.get(mw) == 1:
+                events.append((cycle, "mem", state.get(ma, 0), state.get(md, 0) & 0xFFFF))
+            cycle += 1
+        for code, val in pending:
+            state[code] = val
+        pending.clear()
+        return events
+
+    clk = rst = we = rd = data = mw = ma = md = None
+    in_header = True
+    with open(path) as f:
+        for line in f:
+            tokens = line.split()
+            if not tokens:
+                continue
+            if in_header:
+                if tokens[0] == "$scope":
+                    scope.append(tokens[2])
+                elif tokens[0] == "$upscope":
+                    scope.pop()
+                elif tokens[0] == "$var":
+                    names[tokens[3]] = ".".join(scope + [tokens[4]])
+                elif tokens[0] == "$enddefinitions":
+                    in_header = False
+                    clk, rst = ident("clk"), ident("rst")
+                    we, rd, data = ident("MEM_WB_regWrite"), ident("MEM_WB_rd"), ident("MEM_WB_alu_out")
+                    mw, ma, md = ident("mem_write"), ident("mem_addr"), ident("mem_data")
+                    if clk is None or we is None:
+                        raise ValueError(f"{path}: missing clk or MEM_WB_* signals")
+                continue
+            # Değer satırları: "#zaman", "1!" (tek bit) ya da "b1010 !" (vektör)
+            head = tokens[0]
+            if head[0] == "#":
+                yield from flush_timestamp()
+            elif head[0] in "bBrR" and len(tokens) > 1:
+                bits = head[1:].translate(_UNKNOWN_BITS)
+                pending.append((tokens[1], int(bits, 2) if head[0] in "bB" else int(float(bits))))
+            elif head[0] in "01xXzZ" and len(head) > 1:
+                pending.append((head[1:], int(head[0]) if head[0] in "01" else 0))
+        yield from flush_timestamp()
+
+
+def trace_events(path):
+    """.vcd ya da iz dosyasından yazım olaylarını akış halinde üretir."""
+    if str(path).endswith(".vcd"):
+        yield from _vcd_events(path)
+        return
+    for cyc in read_trace(path):
+        for reg, val in cyc.reg_writes:
+            yield (cyc.cycle, "reg", reg, val & 0xFFFF)
+        for addr, val in cyc.mem_writes:
+            yield (cyc.cycle, "mem", addr, val & 0xFFFF)
+
+
+def diff(path_a, path_b, mode="order", offset=0, regs_only=True, max_report=10):
+    """İki izin yazım olaylarını akış halinde karşılaştırır; farkları döndürür.
+
+    mode="order" sadece yazım sırasını, mode="cycle" ayrıca cycle'ları
+    (b'ye offset eklenerek) karşılaştırır. Verilog testbench'i bellek
+    yazımı raporlamadığı için varsayılan olarak sadece register yazımlarına
+    bakılır.
+    """
+    def events(path):
+        for ev in trace_events(path):
+            if not regs_only or ev[1] == "reg":
+                yield ev
+
+    mismatches = []
+    for i, (a, b) in enumerate(zip_longest(events(path_a), events(path_b))):
+        if a is None or b is None:
+            mismatches.append((i, a, b))
+        elif a[1:] != b[1:] or (mode == "cycle" and a[0] != b[0] + offset):
+            mismatches.append((i, a, b))
+        if len(mismatches) >= max_report:
+            break
+    return mismatches
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="RISC-16 execution trace tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_vcd = sub.add_parser("vcd", help="convert a trace to VCD")
+    p_vcd.add_argument("trace")
+    p_vcd.add_argument("output")
+    p_diff = sub.add_parser("diff", help="compare two traces (.r16t[.gz] or .vcd)")
+    p_diff.add_argument("a")
+    p_diff.add_argument("b")
+    p_diff.add_argument("--mode", choices=("order", "cycle"), default="order")
+    p_diff.add_argument("--offset", type=int, default=0, help="cycle offset added to b in cycle mode")
+    p_diff.add_argument("--with-memory", action="store_true", help="compare memory writes too")
+    p_diff.add_argument("--max-report", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    if args.command == "vcd":
+        export_vcd(args.trace, args.output)
+        return 0
+
+    mismatches = diff(args.a, args.b, args.mode, args.offset, not args.with_memory, args.max_report)
+    for i, a, b in mismatches:
+        print(f"event {i}: {args.a}: {a}  |  {args.b}: {b}")
+    print("traces match" if not mismatches else f"{len(mismatches)} mismatch(es) shown")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
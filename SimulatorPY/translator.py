@@ -0,0 +1,213 @@
+import sys
+import time
+from array import array
+
+from engine import CPU, IMEM_SIZE, WORD, BusError, Op, R_TYPE, CONTROL
+
+
+def _reg(i):
+    # R0 her zaman 0 olduğu için sabit olarak yazılır
+    return "0" if i == 0 else f"r{i}"
+
+
+def _wrap(expr):
+    # to_signed_16'nın satır içi hali
+    return f"((({expr}) + 0x8000) & 0xFFFF) - 0x8000"
+
+
+class BlockTranslator:
+    """Fonksiyonel mod için basic block derleyicisi (threaded code).
+
+    Program, label'larda ve dallanma/atlama komutlarından sonra basic
+    block'lara bölünür. Her block bir kez Python fonksiyonuna derlenir:
+    register'lar yerel değişkenlerde tutulur, 16-bit maskeleme satır içine
+    gömülür. Derlenen block'lar başlangıç adresine göre önbelleğe alınır ve
+    instruction memory yeniden yüklenince (load_program) geçersiz sayılır.
+
+    Kullanım: cpu.translator = BlockTranslator()
+    """
+
+    def __init__(self):
+        self.cache = {}
+        self.compiled_blocks = 0
+        self._imem = None
+        self._leaders = frozenset()
+        self._mask = 0
+        self._ram = 0
+        self._cpu = None
+
+    def invalidate(self):
+        self.cache = {}
+        self._imem = None
+
+    def _sync(self, cpu):
+        if (cpu.instruction_memory is not self._imem or cpu.addr_mask != self._mask
+                or len(cpu.memory) != self._ram or cpu is not self._cpu):
+            self.cache = {}
+            self._imem = cpu.instruction_memory
+            self._leaders = frozenset(cpu.labels.values())
+            self._mask = cpu.addr_mask
+            self._ram = len(cpu.memory)
+            self._cpu = cpu
+
+    def compile_block(self, start):
+        """start adresinden başlayan block'u derler: (fonksiyon, komut sayısı, bitiş)."""
+        imem = self._imem
+        body = []
+        used = set()
+        written = set()
+        tail = None
+        io = self._ram <= self._mask  # adres uzayı RAM'den büyük: cihaz erişimi olabilir
+        pc = start
+        while pc < IMEM_SIZE and imem[pc] is not None:
+            ins = imem[pc]
+            # Cihaza gidebilen lw/sw block başında olur: BusError'da block'tan
+            # hiçbir şey yürütülmemiştir, PC ve register'lar kesindir
+            if pc != start and (pc in self._leaders or (io and (ins.op == Op.LW or ins.op == Op.SW))):
+                break
+            pc += 1
+            op = ins.op
+            used.update(ins.srcs)
+            if ins.rd > 0:
+                used.add(ins.rd)
+                written.add(ins.rd)
+            d, a, b = _reg(ins.rd), _reg(ins.rs), _reg(ins.rt)
+
+            if op in R_TYPE:
+                if ins.rd <= 0:
+                    continue
+                if op == Op.ADD: body.append(f"{d} = {_wrap(f'{a} + {b}')}")
+                elif op == Op.SUB: body.append(f"{d} = {_wrap(f'{a} - {b}')}")
+                elif op == Op.AND: body.append(f"{d} = {a} & {b}")
+                elif op == Op.OR: body.append(f"{d} = {a} | {b}")
+                else: body.append(f"{d} = 1 if {a} < {b} else 0")
+            elif op == Op.ADDI:
+                if ins.rd > 0: body.append(f"{d} = {_wrap(f'{a} + {ins.imm}')}")
+            elif op == Op.SLL:
+                if ins.rd > 0: body.append(f"{d} = {_wrap(f'{a} << {ins.imm}')}")
+            elif op == Op.SRL:
+                if ins.rd > 0: body.append(f"{d} = {_wrap(f'({a} & 0xFFFF) >> {ins.imm}')}")
+            elif op == Op.LW:
+                if io:
+                    body.append(f"_a = ({a} + {ins.imm}) & {self._mask}")
+                    if ins.rd > 0:
+                        body.append(f"{d} = unpack_from(mem, _a)[0] if _a < {self._ram} else read_word(_a)")
+                    else:
+                        body.append(f"if _a >= {self._ram}: read_word(_a)")  # eşlenmemişse BusError
+                elif ins.rd > 0:
+                    body.append(f"{d} = unpack_from(mem, ({a} + {ins.imm}) & {self._mask})[0]")
+            elif op == Op.SW:
+                if io:
+                    body.append(f"_a = ({a} + {ins.imm}) & {self._mask}")
+                    body.append(f"if _a < {self._ram}: pack_into(mem, _a, {b})")
+                    body.append(f"else: write_word(_a, {b})")
+                else:
+                    body.append(f"pack_into(mem, ({a} + {ins.imm}) & {self._mask}, {b})")
+            elif op in CONTROL:
+                if op == Op.JAL and ins.rd > 0 and ins.target is not None:
+                    body.append(f"{d} = {ins.addr + 1}")
+                tail = ins
+                break
+
+        count = pc - start
+        if count == 0:
+            return None, 0, start
+
+        # Çıkış: değişen register'ları geri yaz, sonraki PC'yi döndür
+        exit_lines = [f"r[{i}] = r{i}" for i in sorted(written)]
+        nxt = pc
+        if tail is None:
+            exit_lines.append(f"return {nxt}")
+        elif tail.op == Op.JR:
+            exit_lines.append(f"return {_reg(tail.rs)}")
+        elif tail.op == Op.HALT:
+            exit_lines.append(f"return {IMEM_SIZE}")
+        elif tail.target is None:
+            # Tanımsız label: orijinal execute gibi etkisiz
+            exit_lines.append(f"return {nxt}")
+        elif tail.op in (Op.J, Op.JAL):
+            exit_lines.append(f"return {tail.target}")
+        else:
+            cmp = "==" if tail.op == Op.BEQ else "!="
+            exit_lines.append(f"return {tail.target} if {_reg(tail.rs)} {cmp} {_reg(tail.rt)} else {nxt}")
+
+        lines = [f"def block_{start}(r, mem):"]
+        lines += [f"    r{i} = r[{i}]" for i in sorted(used) if i > 0]
+        lines += ["    " + line for line in body + exit_lines]
+        namespace = {"unpack_from": WORD.unpack_from, "pack_into": WORD.pack_into}
+        if io:
+            namespace.update(read_word=self._cpu.read_word, write_word=self._cpu.write_word)
+        exec("\n".join(lines), namespace)
+        self.compiled_blocks += 1
+        return namespace[f"block_{start}"], count, pc
+
+    def run(self, cpu, max_instructions=None, stop_pc=None):
+        """CPU.run_functional ile aynı sözleşme; yürütülen komut sayısını döndürür."""
+        self._sync(cpu)
+        cache = self.cache
+        compile_block = self.compile_block
+        mem = cpu.memory
+        r = cpu.regs.tolist()
+        pc = cpu.pc
+        limit = sys.maxsize if max_instructions is None else max_instructions
+        count = 0
+        try:
+            while count < limit and pc != stop_pc and 0 <= pc < IMEM_SIZE:
+                try:
+                    fn, n, end = cache[pc]
+                except KeyError:
+                    fn, n, end = cache[pc] = compile_block(pc)
+                if fn is None:
+                    break
+                if count + n > limit or (stop_pc is not None and pc < stop_pc < end):
+                    # Block sınırı durma noktasına uymuyor: tek komut yorumla
+                    cpu.regs[1:] = array("h", r[1:])
+                    cpu.pc = pc
+                    count += cpu._interpret(1)
+                    r = cpu.regs.tolist()
+                    pc = cpu.pc
+                    continue
+                pc = fn(r, mem)
+                count += n
+        except BusError:
+            cpu.functional_instr_count += count
+            raise
+        finally:
+            cpu.regs[1:] = array("h", r[1:])
+            cpu.pc = pc
+        return count
+
+
+def benchmark(source, repeat=3):
+    """Pipeline, yorumlayıcı ve derlenmiş block'lar için komut/saniye ölçer."""
+    results = {}
+    for name in ("pipeline", "functional", "translated"):
+        best = None
+        for _ in range(repeat):
+            cpu = CPU()
+            cpu.verbose = False
+            cpu.load_program(source)
+            if name != "pipeline":
+                cpu.set_mode("functional")
+            if name == "translated":
+                cpu.translator = BlockTranslator()
+            start = time.perf_counter()
+            cpu.run()
+            elapsed = time.perf_counter() - start
+            instructions = cpu.executed_instr_count + cpu.functional_instr_count
+            if best is None or elapsed < best[0]:
+                best = (elapsed, instructions)
+        elapsed, instructions = best
+        results[name] = instructions / elapsed if elapsed else 0.0
+    return results
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("usage: python translator.py program.asm")
+        sys.exit(2)
+    with open(sys.argv[1]) as f:
+        rates = benchmark(f.read())
+    base = rates["pipeline"]
+    for name, rate in rates.items():
+        print(f"{name:>10}: {rate:14,.0f} instr/s  (x{rate / base if base else 0:.1f})")
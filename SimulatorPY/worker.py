@@ -0,0 +1,206 @@
+import queue
+import threading
+import time
+from collections import namedtuple
+from types import MappingProxyType
+
+from breakpoints import BreakpointSet
+from checkpoint import CheckpointRing
+from engine import CPU
+
+# GUI'ye gönderilen değişmez durum görüntüsü.
+#   pipeline:    ((stage, text, op), ...) 5 aşama
+#   registers:   (R0, ..., R7)
+#   metrics:     salt okunur get_performance_metrics() kopyası
+#   memory:      full ise belleğin tamamı (bytes), değilse None
+#   memory_diff: son görüntüden beri sw ile yazılan ((word_addr, word), ...)
+#   message:     None ya da ("loaded" | "done" | "break" | "error" | "warning", metin)
+Snapshot = namedtuple("Snapshot", "pipeline registers metrics memory memory_diff running finished message")
+
+
+class SimWorker(threading.Thread):
+    """CPU'yu Tk ana thread'inin dışında çalıştıran arka plan worker'ı.
+
+    Komutlar (load/run/pause/step/step_back/run_to/breakpoints/reset/stop)
+    sınırsız bir kuyruktan alınır. Koşu breakpoint'lere takılınca durur.
+    Durum, en fazla saniyede publish_hz kez ve sadece sınırlı snapshot
+    kuyruğunda yer varsa yayınlanır; yer yoksa değişiklikler CPU'da birikir
+    ve bir sonraki snapshot'a eklenir, böylece hiçbir bellek yazımı kaybolmaz.
+    """
+
+    def __init__(self, cpu=None, publish_hz=60, queue_size=2):
+        super().__init__(daemon=True)
+        self.cpu = cpu if cpu is not None else CPU()
+        self.cpu.track_changes = True
+        if self.cpu.checkpoints is None:
+            self.cpu.checkpoints = CheckpointRing(interval=1000, capacity=256)
+        self.commands = queue.Queue()
+        self.snapshots = queue.Queue(maxsize=queue_size)
+        self.publish_interval = 1.0 / publish_hz
+        self.chunk = 1000  # tam hızda bir seferde koşulan cycle sayısı
+        self._running = False
+        self._delay = 0.0
+        self._stopped = False
+        self._last_publish = 0.0
+        self._pending = True   # zorunlu snapshot bekliyor mu
+        self._full = True      # bir sonraki snapshot belleğin tamamını taşısın mı
+        self._message = None
+
+    # --- GUI tarafından çağrılan komutlar ---
+    def load(self, raw_code):
+        self.commands.put(("load", raw_code))
+
+    def run_sim(self, delay=0.0):
+        """delay saniyede bir cycle ilerler; 0 ise tam hızda koşar."""
+        self.commands.put(("run", delay))
+
+    def pause(self):
+        self.commands.put(("pause", None))
+
+    def step(self):
+        self.commands.put(("step", None))
+
+    def step_back(self, cycles=1):
+        self.commands.put(("step_back", cycles))
+
+    def run_to(self, cycle):
+        self.commands.put(("run_to", cycle))
+
+    def set_breakpoints(self, specs):
+        """Tüm breakpoint'leri verilen tanımlarla değiştirir (bkz. BreakpointSet.add)."""
+        self.commands.put(("breakpoints", tuple(specs)))
+
+    def reset(self):
+        self.commands.put(("reset", None))
+
+    def stop(self):
+        self.commands.put(("stop", None))
+
+    # --- Worker thread ---
+    def run(self):
+        while not self._stopped:
+            if self._running:
+                timeout = self._delay
+            else:
+                timeout = 0.01 if self._pending else None
+            try:
+                if timeout == 0:
+                    cmd, arg = self.commands.get_nowait()
+                else:
+                    cmd, arg = self.commands.get(timeout=timeout)
+            except queue.Empty:
+                cmd = None
+            if cmd is not None:
+                self._handle(cmd, arg)
+            elif self._running:
+                self._advance()
+            self._publish()
+
+    def _handle(self, cmd, arg):
+        cpu = self.cpu
+        if cmd == "stop":
+            self._stopped = True
+        elif cmd == "load":
+            self._running = False
+            try:
+                cpu.load_program(arg)
+                self._message = ("loaded", "Program loaded into Instruction Memory.")
+            except ValueError as e:
+                self._message = ("error", str(e))
+            self._full = True
+        elif cmd == "run":
+            self._delay = arg
+            self._running = not cpu.is_finished()
+            if not self._running:
+                self._message = ("done", "Program execution finished.")
+        elif cmd == "pause":
+            self._running = False
+        elif cmd == "step":
+            self._running = False
+            try:
+                if not cpu.step():
+                    self._message = ("done", "Program execution finished.")
+            except ValueError as e:  # ör. engine.BusError
+                self._message = ("warning", str(e))
+        elif cmd in ("step_back", "run_to"):
+            self._running = False
+            try:
+                if cmd == "step_back":
+                    cpu.checkpoints.step_back(cpu, arg)
+                else:
+                    cpu.checkpoints.run_to_cycle(cpu, arg)
+            except ValueError as e:
+                self._message = ("warning", str(e))
+            self._full = True
+        elif cmd == "breakpoints":
+            bps = BreakpointSet()
+            try:
+                for spec in arg:
+                    bps.add(spec)
+            except ValueError as e:
+                self._message = ("warning", str(e))
+            cpu.breakpoints = bps
+        elif cmd == "reset":
+            self._running = False
+            cpu.reset()
+            self._full = True
+        self._pending = True
+
+    def _advance(self):
+        cpu = self.cpu
+        try:
+            if self._delay > 0:
+                _, hit = cpu.run_until_break(max_cycles=1)
+            else:
+                # Parçayı ~5 ms sürecek şekilde ayarla ki komutlara hızlı cevap verilsin
+                verbose, cpu.verbose = cpu.verbose, False
+                start = time.perf_counter()
+                try:
+                    _, hit = cpu.run_until_break(max_cycles=self.chunk)
+                finally:
+                    cpu.verbose = verbose
+                elapsed = time.perf_counter() - start
+                if elapsed > 0:
+                    self.chunk = max(100, int(self.chunk * min(max(0.005 / elapsed, 0.5), 2.0)))
+        except ValueError as e:
+            # Ör. breakpoint'teki label yüklü programda yok ya da engine.BusError
+            self._running = False
+            self._message = ("warning", str(e))
+            self._pending = True
+            return
+        if hit is not None:
+            self._running = False
+            self._message = ("break", hit)
+            self._pending = True
+        elif cpu.is_finished():
+            self._running = False
+            self._message = ("done", "Program execution finished.")
+            self._pending = True
+
+    def _publish(self):
+        now = time.perf_counter()
+        if not self._pending and now - self._last_publish < self.publish_interval:
+            return
+        if self.snapshots.full():
+            return  # GUI yetişemiyor; değişiklikler CPU'da birikmeye devam eder
+        cpu = self.cpu
+        _, dirty_mem, _ = cpu.take_changes()
+        if self._full:
+            memory, memory_diff = bytes(cpu.memory), ()
+        else:
+            memory = None
+            memory_diff = tuple((addr, cpu.read_word(addr)) for addr in sorted(dirty_mem))
+        snapshot = Snapshot(
+            pipeline=tuple((stage, instr.text, int(instr.op)) for stage, instr in cpu.pipeline.items()),
+            registers=tuple(cpu.regs),
+            metrics=MappingProxyType(cpu.get_performance_metrics()),
+            memory=memory,
+            memory_diff=memory_diff,
+            running=self._running,
+            finished=cpu.is_finished(),
+            message=self._message,
+        )
+        self.snapshots.put_nowait(snapshot)
+        self._last_publish = now
+        self._pending = self._full = False
+        self._message = None